@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -30,7 +31,6 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
-    'debug_toolbar',
     'django_filters',
     'djoser',
     'students',
@@ -38,9 +38,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    'students.middleware.MetricsMiddleware',
+    'students.middleware.CompressionMiddleware',
+    'students.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'students.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -49,10 +51,6 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-INTERNAL_IPS = [
-    "127.0.0.1"
-]
-
 ROOT_URLCONF = 'IELTSstudents.urls'
 
 TEMPLATES = [
@@ -74,6 +72,53 @@ TEMPLATES = [
 WSGI_APPLICATION = 'IELTSstudents.wsgi.application'
 
 
+# Connection reuse, configured from the environment. DB_POOL_SIZE > 0 switches
+# to the pooled backend, which caps connections per worker process and
+# validates them before use; requests then return connections to the pool.
+
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+DB_CONN_HEALTH_CHECKS = os.environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes')
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 0))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+
+
+def get_connection_settings():
+    if DB_POOL_SIZE:
+        return {
+            'ENGINE': 'students.db.backends.mysql',
+            'CONN_MAX_AGE': 0,
+            'POOL': {'MAX_SIZE': DB_POOL_SIZE, 'TIMEOUT': DB_POOL_TIMEOUT},
+        }
+    return {
+        'ENGINE': 'django.db.backends.mysql',
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+    }
+
+
+# Read replicas. Safe-method requests to the API viewsets and admin
+# changelists read from DATABASE_REPLICAS, chosen per request by
+# 'round_robin' or 'least_lag'; least_lag skips replicas more than
+# DATABASE_REPLICA_MAX_LAG seconds behind, checking lag at most every
+# DATABASE_REPLICA_LAG_TTL seconds. A client that writes reads from the
+# primary for the next DATABASE_REPLICA_PIN_SECONDS.
+
+DATABASE_ROUTERS = ['students.db.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_SELECTION = os.environ.get('DB_REPLICA_SELECTION', 'round_robin')
+DATABASE_REPLICA_MAX_LAG = float(os.environ.get('DB_REPLICA_MAX_LAG', 5))
+DATABASE_REPLICA_LAG_TTL = float(os.environ.get('DB_REPLICA_LAG_TTL', 1))
+DATABASE_REPLICA_PIN_SECONDS = float(os.environ.get('DB_REPLICA_PIN_SECONDS', 5))
+
+
+def get_replica_databases(primary, hosts):
+    """A `replica_N` alias per host, otherwise configured like `primary` and mirroring it in tests."""
+    return {
+        f'replica_{number}': {**primary, 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+        for number, host in enumerate(hosts, 1)
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -116,10 +161,43 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+STUDENT_URGENT_WINDOW = timedelta(days=30)
+TEACHER_RECENT_REVIEW_WINDOW = timedelta(days=30)
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+# Authenticated users are cached per process; another worker sees a changed
+# user once its entry times out.
+AUTH_USER_CACHE_TIMEOUT = 60
+AUTH_USER_CACHE_SIZE = 1024
+
+# Share of requests recorded for /metrics; 0 removes the middleware. Scrapers
+# authenticate with `Authorization: Bearer $METRICS_TOKEN`.
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', 1))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Responses smaller than this are sent uncompressed.
+COMPRESSION_MIN_SIZE = 1024
+
 REST_FRAMEWORK = {
     'COERCE_DECIMAL_TO_STRING': False,
+    'DEFAULT_RENDERER_CLASSES': (
+        'students.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'students.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'students.authentication.CachedJWTAuthentication',
     )
 }
 
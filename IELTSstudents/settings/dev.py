@@ -2,6 +2,14 @@ from .common import *
 
 DEBUG = True
 
+INSTALLED_APPS += ['debug_toolbar']
+
+MIDDLEWARE.insert(0, 'debug_toolbar.middleware.DebugToolbarMiddleware')
+
+INTERNAL_IPS = [
+    "127.0.0.1"
+]
+
 SECRET_KEY = 'django-insecure-te04#)qd(^l18b0sbti8dlvm^@*l%argc4t574c#ov4f-n%bgg'
 
 # Database
@@ -9,11 +17,13 @@ SECRET_KEY = 'django-insecure-te04#)qd(^l18b0sbti8dlvm^@*l%argc4t574c#ov4f-n%bgg
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        **get_connection_settings(),
         'NAME': 'ieltsstudents',
         'HOST': 'localhost',
         'PORT': '3306',
         'USER': 'root',
         'PASSWORD': '1223',
     }
-}
\ No newline at end of file
+}
+# Routing is off by default; tests turn it on against this mirror of default.
+DATABASES.update(get_replica_databases(DATABASES['default'], ['localhost']))
@@ -5,4 +5,29 @@ DEBUG = False
 
 SECRET_KEY = os.environ['SECRET_KEY']
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host]
+
+DATABASES = {
+    'default': {
+        **get_connection_settings(),
+        'NAME': os.environ.get('DB_NAME', 'ieltsstudents'),
+        'HOST': os.environ.get('DB_HOST', 'mysql'),
+        'PORT': os.environ.get('DB_PORT', '3306'),
+        'USER': os.environ.get('DB_USER', 'root'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+    }
+}
+
+# Shared by every worker process, so invalidating a response, a cached user
+# or a read-after-write pin in one is seen by all of them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://redis:6379/0'),
+    }
+}
+
+DATABASES.update(get_replica_databases(
+    DATABASES['default'], [host for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if host]
+))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
@@ -0,0 +1,35 @@
+"""
+Development settings that route reads to a second SQLite file, to try the
+read-replica setup without MySQL.
+
+db.sqlite3 is the primary and db.replica.sqlite3 its replica. Nothing
+replicates between them: copy the primary over the replica to catch it up,
+
+    cp db.sqlite3 db.replica.sqlite3
+
+and writes made since the last copy stay invisible to routed reads, like
+those of a lagging replica.
+"""
+import tempfile
+from .dev import *
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    'replica_1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+DATABASE_REPLICAS = ['replica_1']
+
+# Read-after-write pins must outlive the process, like they would in Redis.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'ieltsstudents-cache',
+    }
+}
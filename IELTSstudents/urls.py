@@ -16,15 +16,19 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
+from students.views import MetricsView
 
 urlpatterns = [
     path('', include('core.urls')),
     path('admin/', admin.site.urls),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.jwt')),
-    path('__debug__/', include('debug_toolbar.urls')),
-    path('ielts/', include('students.urls'))
+    path('ielts/', include('students.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
 
+if 'debug_toolbar' in settings.INSTALLED_APPS:
+    urlpatterns.append(path('__debug__/', include('debug_toolbar.urls')))
+
 admin.site.site_header = 'IELTS Course Admin'
 admin.site.index_title = 'Admin Site'
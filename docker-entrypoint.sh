@@ -7,4 +7,4 @@ echo "Migrating the database"
 python manage.py migrate
 
 echo "Starting the server"
-python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+exec python manage.py serve --bind 0.0.0.0:8000
\ No newline at end of file
@@ -1,10 +1,13 @@
-from datetime import datetime, date
 from django.db.models.query import QuerySet
-from django.db.models.aggregates import Count
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
 from django.urls import reverse
 from django.utils.html import format_html, urlencode
 from . import models
+from .exports import stream_csv, STUDENT_COLUMNS
+from .pagination import CachedCountPaginator
 
 
 class StudentStatusFilter(admin.SimpleListFilter):
@@ -12,23 +15,16 @@ class StudentStatusFilter(admin.SimpleListFilter):
     parameter_name = 'student_status'
 
     def lookups(self, request, model_admin):
-        return [
-            ('< datetime.date(datetime.now()', 'FINISHED'),
-            ('< date(2022, 4, 30)', 'URGENT'),
-            ('>= date(2022, 4, 30)', 'REGULAR')
-        ]
+        return models.Student.STATUS_CHOICES
 
     def queryset(self, request, queryset: QuerySet):
-        if self.value() == '< datetime.date(datetime.now()':
-            return queryset.filter(exam_date__lt=datetime.date(datetime.now()))
-        if self.value() == '< date(2022, 4, 30)':
-            return queryset.filter(exam_date__lt=date(2022, 4, 30), exam_date__gte=datetime.date(datetime.now()))
-        if self.value() == '>= date(2022, 4, 30)':
-            return queryset.filter(exam_date__gte=date(2022, 4, 30))
+        if self.value() in dict(models.Student.STATUS_CHOICES):
+            return queryset.filter_status(self.value())
 
 
 @admin.register(models.Student)
 class StudentAdmin(admin.ModelAdmin):
+    actions = ['export_as_csv']
     autocomplete_fields = ['curator']
     list_editable = [
         'first_name',
@@ -52,21 +48,72 @@ class StudentAdmin(admin.ModelAdmin):
     ]
     list_filter = ['course', 'curator', StudentStatusFilter]
     list_per_page = 20
-    search_fields = ['last_name__istartswith', 'phone']
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+    search_fields = ['last_name__istartswith', 'phone__istartswith']
 
+    # Exam dates order students the way their statuses do, and student_exam_date_idx serves the sort.
     @admin.display(ordering='exam_date')
     def urgent_students(self, student):
-        if student.exam_date < datetime.date(datetime.now()):
-            return "FINISHED"
-        elif student.exam_date < date(2022, 4, 30):
-            return "URGENT"
-        return "REGULAR"
+        return student.status
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_status()
+
+    @admin.action(description='Export selected students as CSV')
+    def export_as_csv(self, request, queryset):
+        return stream_csv(queryset, STUDENT_COLUMNS, 'students.csv')
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    per_page = 20
+    page_param = 'page'
+    request = None
+
+    def get_queryset(self):
+        if not hasattr(self, '_page_queryset'):
+            try:
+                self.page = max(int(self.request.GET.get(self.get_page_param(), 1)), 1)
+            except ValueError:
+                self.page = 1
+            offset = (self.page - 1) * self.per_page
+            queryset = super().get_queryset()
+            # OFFSET pages only line up across requests under a total order.
+            ordering = queryset.query.order_by or self.model._meta.ordering
+            rows = list(queryset.order_by(*ordering, 'pk')[offset:offset + self.per_page + 1])
+            self.has_next = len(rows) > self.per_page
+            self._page_queryset = rows[:self.per_page]
+        return self._page_queryset
+
+    def get_page_param(self):
+        return f'{self.prefix}-{self.page_param}'
 
-class StudentInline(admin.StackedInline):
+    def get_page_url(self, page):
+        query = self.request.GET.copy()
+        query[self.get_page_param()] = page
+        return f'?{query.urlencode()}'
+
+    def previous_url(self):
+        return self.get_page_url(self.page - 1) if self.page > 1 else None
+
+    def next_url(self):
+        return self.get_page_url(self.page + 1) if self.has_next else None
+
+
+class StudentInline(admin.TabularInline):
     model = models.Student
+    formset = PaginatedInlineFormSet
+    template = 'admin/students/paginated_tabular.html'
+    fields = ['course', 'first_name', 'last_name', 'phone', 'email', 'exam_date', 'package', 'user']
+    raw_id_fields = ['user']
+    show_change_link = True
     extra = 0
 
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.request = request
+        return formset
+
 
 @admin.register(models.Curator)
 class CuratorAdmin(admin.ModelAdmin):
@@ -85,7 +132,7 @@ class CuratorAdmin(admin.ModelAdmin):
         return format_html('<a href="{}">{}</a>', url, curator.student_count)
 
     def get_queryset(self, request):
-        return super().get_queryset(request).annotate(student_count=Count('student__id'))
+        return super().get_queryset(request).annotate(student_count=Coalesce(F('workload__student_count'), 0))
 
 
 @admin.register(models.Teacher)
@@ -0,0 +1,187 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from .models import Curator, Student, Teacher, TeacherReviewStats, GroupSession, Review
+from .serializers import StudentSerializer, CuratorSerializer, TeacherSerializer, GroupSessionSerializer, \
+    ReviewSerializer
+from .pagination import StudentCursorPagination, ReviewCursorPagination
+from .renderers import ORJSONRenderer
+from . import metrics
+from .views import CuratorViewSet, StudentViewSet, TeacherViewSet, GroupSessionViewSet, ReviewViewSet, \
+    TEACHER_REVIEW_ALIASES
+
+
+async def afetch(queryset):
+    if queryset._prefetch_related_lookups:
+        # aiterator() can't run prefetch_related() before Django 5.0.
+        return [instance async for instance in queryset]
+    return [instance async for instance in queryset.aiterator()]
+
+
+class AsyncReadOnlyView(View):
+    """
+    Async list and retrieve handler for the read path of a resource.
+
+    Authentication, permissions, serializers, filter backends and cursor
+    pagination are the ones the matching viewset uses; only the queries run
+    through the async ORM, so under ASGI a request waiting on the database
+    doesn't hold a worker thread. Viewset features these views don't have,
+    like sparse fieldsets and expansions, are refused with a 400 rather
+    than silently ignored.
+    """
+    http_method_names = ['get']
+    queryset = None
+    serializer_class = None
+    pagination_class = None
+    filter_backends = []
+    unsupported_query_params = ('fields', 'omit', 'expand', 'stream')
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = [IsAuthenticated]
+    renderer = ORJSONRenderer()
+
+    async def get(self, request, pk=None, **kwargs):
+        request = Request(request, authenticators=[auth() for auth in self.authentication_classes])
+        try:
+            await self.check_permissions(request)
+            self.check_query_params(request)
+            if pk is None:
+                data = await self.list(request)
+            else:
+                data = await self.retrieve(request, pk)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request, exc)
+        return self.render(data)
+
+    async def check_permissions(self, request):
+        # Resolving the user may load it from the database.
+        await sync_to_async(lambda: request.user)()
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if request.successful_authenticator is None:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+    def check_query_params(self, request):
+        unsupported = [param for param in self.unsupported_query_params if param in request.query_params]
+        if unsupported:
+            raise exceptions.ValidationError({param: ['Not supported on the async routes.'] for param in unsupported})
+
+    def get_queryset(self, request):
+        return self.queryset.all()
+
+    def filter_queryset(self, request, queryset):
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(request, queryset, self)
+        return queryset
+
+    def get_serializer(self, request, *args, **kwargs):
+        serializer = self.serializer_class(*args, context={'request': request, 'view': self}, **kwargs)
+        return metrics.time_serializer(serializer)
+
+    async def list(self, request):
+        # Backends may query while validating parameters, such as django-filter's choice fields.
+        queryset = await sync_to_async(self.filter_queryset)(request, self.get_queryset(request))
+        if self.pagination_class is None:
+            return self.get_serializer(request, await afetch(queryset), many=True).data
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, request, self)
+        if not page:
+            await self.check_empty_page(request)
+        return paginator.get_paginated_response(self.get_serializer(request, page, many=True).data).data
+
+    async def check_empty_page(self, request):
+        pass
+
+    async def retrieve(self, request, pk):
+        try:
+            instance = await self.get_queryset(request).aget(pk=pk)
+        except self.queryset.model.DoesNotExist:
+            raise exceptions.NotFound()
+        return self.get_serializer(request, instance).data
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), content_type=self.renderer.media_type, status=status_code)
+
+    def handle_exception(self, request, exc):
+        detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = self.render(detail, exc.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticators = request.authenticators
+            header = authenticators[0].authenticate_header(request) if authenticators else None
+            if header:
+                response['WWW-Authenticate'] = header
+            else:
+                response.status_code = status.HTTP_403_FORBIDDEN
+        return response
+
+
+class AsyncCuratorView(AsyncReadOnlyView):
+    queryset = Curator.objects.all()
+    serializer_class = CuratorSerializer
+    filter_backends = CuratorViewSet.filter_backends
+    search_fields = CuratorViewSet.search_fields
+
+
+class AsyncStudentView(AsyncReadOnlyView):
+    queryset = Student.objects.all()
+    serializer_class = StudentSerializer
+    pagination_class = StudentCursorPagination
+    filter_backends = StudentViewSet.filter_backends
+    ordering_fields = StudentViewSet.ordering_fields
+
+    def get_queryset(self, request):
+        queryset = Student.objects.select_related('curator')
+        course = request.query_params.get('course')
+        if course is not None:
+            queryset = queryset.filter(course=course)
+        status_filter = request.query_params.get('status')
+        if status_filter in dict(Student.STATUS_CHOICES):
+            queryset = queryset.filter_status(status_filter)
+        return queryset.with_status()
+
+
+class AsyncTeacherView(AsyncReadOnlyView):
+    queryset = Teacher.objects.select_related('review_stats').prefetch_related('groupsessions').alias(
+        **TEACHER_REVIEW_ALIASES
+    )
+    serializer_class = TeacherSerializer
+    filter_backends = TeacherViewSet.filter_backends
+    filterset_fields = TeacherViewSet.filterset_fields
+    search_fields = TeacherViewSet.search_fields
+    ordering_fields = TeacherViewSet.ordering_fields
+
+    async def list(self, request):
+        await sync_to_async(TeacherReviewStats.refresh_recent_daily)()
+        return await super().list(request)
+
+    async def retrieve(self, request, pk):
+        await sync_to_async(TeacherReviewStats.refresh_recent_daily)()
+        return await super().retrieve(request, pk)
+
+
+class AsyncGroupSessionView(AsyncReadOnlyView):
+    queryset = GroupSession.objects.prefetch_related('teacher')
+    serializer_class = GroupSessionSerializer
+    filter_backends = GroupSessionViewSet.filter_backends
+    filterset_fields = GroupSessionViewSet.filterset_fields
+    search_fields = GroupSessionViewSet.search_fields
+    ordering_fields = GroupSessionViewSet.ordering_fields
+
+
+class AsyncReviewView(AsyncReadOnlyView):
+    queryset = Review.objects.all()
+    serializer_class = ReviewSerializer
+    pagination_class = ReviewCursorPagination
+    filter_backends = ReviewViewSet.filter_backends
+    search_fields = ReviewViewSet.search_fields
+
+    def get_queryset(self, request):
+        return Review.objects.filter(teacher_id=self.kwargs['teacher_pk'])
+
+    async def check_empty_page(self, request):
+        if not await Teacher.objects.filter(pk=self.kwargs['teacher_pk']).aexists():
+            raise exceptions.NotFound()
@@ -0,0 +1,103 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from . import cache
+
+stats = cache.CacheStats(('hits', 'misses'))
+
+# str(user id) -> (expiry on the monotonic clock, user), least recently used first. Tokens
+# carry the id as a string in newer simplejwt releases.
+_users = OrderedDict()
+_users_lock = threading.Lock()
+
+
+def get_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+
+def get_max_size():
+    return getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024)
+
+
+def get_cached_user(user_id):
+    key, now = str(user_id), time.monotonic()
+    with _users_lock:
+        entry = _users.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del _users[key]
+            return None
+        _users.move_to_end(key)
+    # Requests may set attributes on their user, such as permission caches.
+    return copy.copy(entry[1])
+
+
+def cache_user(user_id, user):
+    key = str(user_id)
+    with _users_lock:
+        _users[key] = (time.monotonic() + get_timeout(), copy.copy(user))
+        _users.move_to_end(key)
+        while len(_users) > get_max_size():
+            _users.popitem(last=False)
+
+
+def drop_user(user_id):
+    with _users_lock:
+        _users.pop(str(user_id), None)
+
+
+def invalidate_user(user_id, using=None):
+    """Drop the cached user now and again once the transaction commits."""
+    drop_user(user_id)
+    transaction.on_commit(lambda: drop_user(user_id), using=using)
+
+
+def reset_users():
+    with _users_lock:
+        _users.clear()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` that keeps resolved users in this process for
+    `AUTH_USER_CACHE_TIMEOUT` seconds instead of loading them on every
+    request, holding at most `AUTH_USER_CACHE_SIZE` of them.
+
+    Entries are keyed by the token's user id, so every token of a user shares
+    one entry. Saving or deleting the user drops it in the process that did
+    so; other worker processes see the change once their entry expires.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            stats.record('misses')
+            user = super().get_user(validated_token)
+            cache_user(user_id, user)
+            return user
+
+        stats.record('hits')
+        self.check_user(user, validated_token)
+        return user
+
+    def check_user(self, user, validated_token):
+        if getattr(api_settings, 'CHECK_USER_IS_ACTIVE', True) and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        # Older simplejwt releases have no revocation claim.
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            from rest_framework_simplejwt.utils import get_md5_hash_password
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
@@ -0,0 +1,89 @@
+import hashlib
+import time
+from threading import Lock
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+VERSION_PREFIX = 'students:version:'
+RESPONSE_PREFIX = 'students:response:'
+
+
+class CacheStats:
+    def __init__(self, outcomes=('hits', 'misses', 'not_modified')):
+        self._lock = Lock()
+        self.outcomes = outcomes
+        self.reset()
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def as_dict(self):
+        return {outcome: getattr(self, outcome) for outcome in self.outcomes}
+
+    def reset(self):
+        with self._lock:
+            for outcome in self.outcomes:
+                setattr(self, outcome, 0)
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def is_process_local():
+    """Whether the cache lives in this process only, so other worker processes never see its writes."""
+    return isinstance(get_cache(), LocMemCache)
+
+
+def get_timeout():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def get_versions(scopes):
+    """
+    Return the current version of every scope.
+
+    A version is the `time.time_ns()` of the scope's last change, so a
+    counter that was evicted from the cache restarts at a value no old entry
+    was stored under.
+    """
+    cache = get_cache()
+    keys = [VERSION_PREFIX + scope for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _bump(scope):
+    get_cache().set(VERSION_PREFIX + scope, time.time_ns(), timeout=None)
+
+
+def invalidate(*scopes, using=None):
+    """
+    Bump the version of every scope now and again once the transaction commits,
+    so a response rendered from pre-commit data can't outlive the commit.
+    """
+    for scope in scopes:
+        _bump(scope)
+        transaction.on_commit(lambda scope=scope: _bump(scope), using=using)
+
+
+def get_response_key(request, permissions, versions):
+    parts = [
+        # Bodies carry absolute hyperlinks, so scheme and host are part of the key.
+        request.build_absolute_uri(request.path),
+        request.META.get('QUERY_STRING', ''),
+        ','.join(type(permission).__name__ for permission in permissions),
+        request.accepted_media_type,
+        *map(str, versions),
+    ]
+    return RESPONSE_PREFIX + hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
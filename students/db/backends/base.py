@@ -0,0 +1,49 @@
+from ..pool import ConnectionPool, PoolTimeout, get_pool
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Take raw connections from a per-process `ConnectionPool` and return them
+    on close instead of disconnecting.
+
+    Configured by the alias's `POOL` dict: `MAX_SIZE` (default 10) and
+    `TIMEOUT` in seconds (default 5). Use with `CONN_MAX_AGE = 0`, so every
+    request hands its connection back.
+    """
+
+    def get_pool(self):
+        options = self.settings_dict.get('POOL', {})
+        return get_pool(self.alias, lambda: ConnectionPool(
+            connect=lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(self.get_connection_params()),
+            validate=self.validate_connection,
+            max_size=options.get('MAX_SIZE', 10),
+            timeout=options.get('TIMEOUT', 5)
+        ))
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self.get_pool().checkout()
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def validate_connection(self, connection):
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+        except Exception:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = self.get_pool()
+        try:
+            # Never hand an open transaction to the next user of the connection.
+            if self.in_atomic_block or not self.autocommit:
+                self.connection.rollback()
+        except Exception:
+            pool.discard(self.connection)
+        else:
+            pool.checkin(self.connection)
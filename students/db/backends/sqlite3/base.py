@@ -0,0 +1,6 @@
+from django.db.backends.sqlite3 import base
+from ..base import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
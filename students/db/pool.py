@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from collections import deque
+from ..cache import CacheStats
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    A capped, thread-safe pool of raw DB-API connections for one database
+    alias in one process.
+
+    Checked-out connections count towards `max_size`; a checkout past the cap
+    waits up to `timeout` seconds for one to be returned. Idle connections
+    are validated before they are handed out and replaced if they fail.
+    """
+
+    def __init__(self, connect, validate, max_size, timeout):
+        self.connect = connect
+        self.validate = validate
+        self.max_size = max_size
+        self.timeout = timeout
+        self.size = 0
+        self.idle = deque()
+        self.condition = threading.Condition()
+        self.stats = CacheStats(('checkouts', 'waits', 'timeouts', 'connects', 'reconnects'))
+
+    def checkout(self):
+        self.stats.record('checkouts')
+        deadline = time.monotonic() + self.timeout
+        with self.condition:
+            if not self.idle and self.size >= self.max_size:
+                self.stats.record('waits')
+            while not self.idle and self.size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.condition.wait(remaining):
+                    if not self.idle and self.size >= self.max_size:
+                        self.stats.record('timeouts')
+                        raise PoolTimeout(f'No connection became free within {self.timeout}s.')
+            connection = self.idle.pop() if self.idle else None
+            self.size += connection is None
+
+        try:
+            if connection is not None:
+                if self.validate(connection):
+                    return connection
+                self.stats.record('reconnects')
+                self.close_quietly(connection)
+            connection = self.connect()
+            self.stats.record('connects')
+            return connection
+        except BaseException:
+            self.release()
+            raise
+
+    def checkin(self, connection):
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    def discard(self, connection):
+        self.close_quietly(connection)
+        self.release()
+
+    def release(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def close_idle(self):
+        with self.condition:
+            while self.idle:
+                self.close_quietly(self.idle.pop())
+                self.size -= 1
+
+    def as_dict(self):
+        return {**self.stats.as_dict(), 'size': self.size, 'idle': len(self.idle), 'max_size': self.max_size}
+
+    @staticmethod
+    def close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def get_pool(alias, factory):
+    """The pool of `alias` in this process; pools inherited across a fork are never reused."""
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = factory()
+        return _pools[key]
+
+
+def get_stats():
+    pid = os.getpid()
+    return {alias: pool.as_dict() for (owner, alias), pool in list(_pools.items()) if owner == pid}
+
+
+def close_idle():
+    pid = os.getpid()
+    for (owner, alias), pool in list(_pools.items()):
+        if owner == pid:
+            pool.close_idle()
@@ -0,0 +1,132 @@
+import threading
+import time
+from contextvars import ContextVar
+from itertools import count
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# Context variables follow a request into the threads sync_to_async runs it on.
+current_state = ContextVar('replica_routing_state', default=None)
+
+_round_robin = count()
+_lags = {}
+_lags_lock = threading.Lock()
+
+
+class RoutingState:
+    """Replica routing of one request."""
+    __slots__ = ('use_replicas', 'pinned', 'wrote', 'alias')
+
+    def __init__(self):
+        self.use_replicas = False
+        # Reads stay on the primary once set.
+        self.pinned = False
+        # Set by writes of the request itself, which pin its client too.
+        self.wrote = False
+        self.alias = None
+
+
+class ReplicaRouter:
+    """
+    Send reads of requests that `ReplicaRoutingMiddleware` marked as
+    read-only to one of `DATABASE_REPLICAS`, and everything else to the
+    primary.
+
+    One replica is chosen per request, by `DATABASE_REPLICA_SELECTION`:
+    'round_robin', or 'least_lag', which picks the replica least behind the
+    primary and falls back to the primary when all of them are further
+    behind than `DATABASE_REPLICA_MAX_LAG` seconds. A write pins the rest of
+    the request to the primary; a write with the `background` hint, such as
+    a rollup refresh, doesn't.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = current_state.get()
+        if state is None or not state.use_replicas or state.pinned:
+            return None
+        if state.alias is None:
+            state.alias = select_replica() or DEFAULT_DB_ALIAS
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = current_state.get()
+        if state is not None and not hints.get('background'):
+            state.pinned = state.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        aliases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def select_replica():
+    """A replica alias to read from, or None if none is usable."""
+    replicas = get_replicas()
+    if not replicas:
+        return None
+    if getattr(settings, 'DATABASE_REPLICA_SELECTION', 'round_robin') != 'least_lag':
+        return replicas[next(_round_robin) % len(replicas)]
+    max_lag = getattr(settings, 'DATABASE_REPLICA_MAX_LAG', 5)
+    lags = {alias: get_lag(alias) for alias in replicas}
+    alias = min(replicas, key=lags.get)
+    return alias if lags[alias] <= max_lag else None
+
+
+def pin_primary():
+    """Read from the primary for the rest of the current request."""
+    state = current_state.get()
+    if state is not None:
+        state.pinned = True
+
+
+def used_replica():
+    state = current_state.get()
+    return state is not None and state.alias not in (None, DEFAULT_DB_ALIAS)
+
+
+def get_lag(alias):
+    """The replication lag of `alias` in seconds, measured at most every `DATABASE_REPLICA_LAG_TTL` seconds."""
+    ttl = getattr(settings, 'DATABASE_REPLICA_LAG_TTL', 1)
+    now = time.monotonic()
+    with _lags_lock:
+        measured = _lags.get(alias)
+    if measured is not None and now - measured[0] < ttl:
+        return measured[1]
+    lag = measure_lag(alias)
+    with _lags_lock:
+        _lags[alias] = (now, lag)
+    return lag
+
+
+def measure_lag(alias):
+    """
+    Seconds the replica `alias` trails its primary. A MySQL replica whose
+    replication is stopped or that can't be reached counts as infinitely
+    behind; a server that isn't replicating, like a local copy, as current.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'mysql':
+        return 0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW REPLICA STATUS')
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description or ()]
+    except DatabaseError:
+        return float('inf')
+    if row is None:
+        return 0
+    lag = dict(zip(columns, row)).get('Seconds_Behind_Source')
+    return float('inf') if lag is None else lag
+
+
+def reset_lags():
+    with _lags_lock:
+        _lags.clear()
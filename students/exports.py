@@ -0,0 +1,61 @@
+import csv
+from django.http import StreamingHttpResponse
+
+STUDENT_COLUMNS = [
+    ('id', 'id'),
+    ('course', 'course'),
+    ('curator', 'curator__name'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('phone', 'phone'),
+    ('email', 'email'),
+    ('skype_name', 'skype_name'),
+    ('ielts_module', 'ielts_module'),
+    ('goal_score', 'goal_score'),
+    ('exam_date', 'exam_date'),
+    ('package', 'package'),
+    ('status', 'status'),
+]
+
+TEACHER_COLUMNS = [
+    ('id', 'id'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('phone', 'phone'),
+    ('email', 'email'),
+    ('skype_name', 'skype_name'),
+    ('about_me', 'about_me'),
+]
+
+REVIEW_COLUMNS = [
+    ('id', 'id'),
+    ('teacher', 'teacher_id'),
+    ('name', 'name'),
+    ('description', 'description'),
+    ('date', 'date'),
+]
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset, columns, filename, chunk_size=2000):
+    """
+    Stream `queryset` as CSV, fetching only the exported columns.
+
+    The header is yielded before the query runs, so the first byte goes out
+    immediately, and rows are read with `iterator()` so memory stays flat.
+    """
+    writer = csv.writer(Echo())
+    rows = queryset.prefetch_related(None).values_list(*[lookup for _, lookup in columns])
+
+    def lines():
+        yield writer.writerow([header for header, _ in columns])
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,114 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.test import Client, AsyncClient, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+RESOURCES = ['students', 'curators', 'teachers', 'group_sessions']
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare throughput and latency percentiles of the WSGI read path, served by a fixed pool of '
+        'worker threads, against the async read path under the ASGI handler, in-process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resources', nargs='+', choices=RESOURCES, default=RESOURCES)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--threads', type=int, default=4, help='WSGI worker threads.')
+        parser.add_argument('--db-delay', type=float, default=0, help='Milliseconds added to every query.')
+        parser.add_argument('--username', help='User to authenticate as; defaults to the first active user.')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        user = users.filter(username=options['username']).first() if options['username'] else users.first()
+        if user is None:
+            raise CommandError('No active user to authenticate as.')
+        self.headers = {'Authorization': f'JWT {AccessToken.for_user(user)}'}
+
+        delay = options['db_delay'] / 1000
+        if delay:
+            def slow_query(execute, sql, params, many, context):
+                time.sleep(delay)
+                return execute(sql, params, many, context)
+
+            def add_delay(sender, connection, **kwargs):
+                connection.execute_wrappers.append(slow_query)
+
+            connection_created.connect(add_delay, weak=False)
+
+        # The test clients always send `Host: testserver`.
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            self.run_all(options)
+
+    def run_all(self, options):
+        self.stdout.write(
+            f'{"resource":>15} {"path":>6} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>6}'
+        )
+        for resource in options['resources']:
+            for name, run in (('wsgi', self.run_wsgi), ('asgi', self.run_asgi)):
+                start = time.perf_counter()
+                timings, errors = run(resource, options)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f'{resource:>15} {name:>6} {len(timings) / elapsed:>8.1f} '
+                    f'{statistics.median(timings) * 1000:>8.2f} {percentile(timings, 0.95) * 1000:>8.2f} '
+                    f'{percentile(timings, 0.99) * 1000:>8.2f} {errors:>6}'
+                )
+
+    def run_wsgi(self, resource, options):
+        client = Client()
+        # Requests queue for a fixed pool of worker threads, as they do behind a threaded WSGI server.
+        server = ThreadPoolExecutor(max_workers=options['threads'])
+
+        async def fetch(n):
+            response = await asyncio.get_running_loop().run_in_executor(
+                server, lambda: client.get(f'/ielts/{resource}/?bench={n}', headers=self.headers)
+            )
+            return response.status_code
+
+        try:
+            return asyncio.run(self.drive(fetch, options))
+        finally:
+            server.shutdown()
+
+    def run_asgi(self, resource, options):
+        client = AsyncClient()
+
+        async def fetch(n):
+            # The ASGI handler gives every request its own thread for sync code.
+            async with ThreadSensitiveContext():
+                response = await client.get(f'/ielts/async/{resource}/?bench={n}', headers=self.headers)
+            return response.status_code
+
+        return asyncio.run(self.drive(fetch, options))
+
+    async def drive(self, fetch, options):
+        """
+        Issue `--requests` requests from `--concurrency` clients and time each
+        one from send to response. Every request has its own query string, so
+        the sync path's response cache never answers.
+        """
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def timed(n):
+            async with semaphore:
+                start = time.perf_counter()
+                status_code = await fetch(n)
+                return time.perf_counter() - start, status_code != 200
+
+        results = await asyncio.gather(*(timed(n) for n in range(options['requests'])))
+        return [timing for timing, _ in results], sum(error for _, error in results)
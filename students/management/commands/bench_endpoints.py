@@ -0,0 +1,272 @@
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router
+from django.test import Client, override_settings
+from django.urls import URLPattern, reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from students import cache, urls
+from students.models import Curator, Student, Teacher, GroupSession, Review
+from students.pagination import DefaultPagination
+from .bench_async import percentile
+from .seed_bench import BENCH_USERNAME
+
+RESOURCE_MODELS = {
+    'students': Student,
+    'curators': Curator,
+    'teachers': Teacher,
+    'group_sessions': GroupSession,
+    'teacher-reviews': Review,
+}
+
+
+def get_routes():
+    """Every named GET route in students.urls, minus the `.json`-style format suffix duplicates."""
+    seen = set()
+    for pattern in urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or 'format' in pattern.pattern.regex.groupindex:
+            continue
+        # Both routers add an api-root.
+        if pattern.name in seen:
+            continue
+        seen.add(pattern.name)
+        callback = pattern.callback
+        actions = getattr(callback, 'actions', None)
+        if actions is not None:
+            allows_get = 'get' in actions
+        else:
+            allows_get = hasattr(getattr(callback, 'view_class', None), 'get')
+        if allows_get:
+            yield pattern.name, list(pattern.pattern.regex.groupindex)
+
+
+def get_resource(name):
+    return name.removeprefix('async-').rsplit('-', 1)[0]
+
+
+def is_export(name):
+    return name.endswith('-export')
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every GET route in students.urls, plus deep-page, search, ordering, expand and streaming '
+        'variants, through the test client against the current database (see `seed_bench`). Writes '
+        'latency percentiles, throughput, query counts and peak memory per scenario to a JSON file and '
+        'can compare it against an earlier run. Run with production-like settings (DEBUG off, no debug '
+        'toolbar) for numbers that match a deployment.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per scenario.')
+        parser.add_argument(
+            '--export-requests', type=int, default=3,
+            help='Timed requests for the CSV export and NDJSON stream scenarios, which read whole tables.'
+        )
+        parser.add_argument(
+            '--cache', choices=['warm', 'cold'], default='cold',
+            help='cold clears the response cache before every request; warm times cache hits.'
+        )
+        parser.add_argument('--only', nargs='+', default=[], help='Run scenarios whose name contains any of these.')
+        parser.add_argument('--output', default='bench-endpoints.json')
+        parser.add_argument('--compare', help='An earlier --output file to compare against.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Relative p95 slowdown, or any query count increase, that fails --compare.'
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=BENCH_USERNAME).first()
+        if user is None:
+            raise CommandError(f'No "{BENCH_USERNAME}" user; run `seed_bench` first.')
+        self.headers = {'Authorization': f'JWT {AccessToken.for_user(user)}'}
+        self.client = Client()
+
+        # The test client always sends `Host: testserver`.
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            scenarios = [
+                scenario for scenario in self.get_scenarios()
+                if not options['only'] or any(part in scenario[0] for part in options['only'])
+            ]
+            if not scenarios:
+                raise CommandError('No scenario matches --only.')
+            self.stdout.write(
+                f'{"scenario":>40} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+                f'{"queries":>7} {"peak KiB":>9} {"errors":>6}'
+            )
+            results = {}
+            for name, path, streaming in scenarios:
+                requests = options['export_requests'] if streaming else options['requests']
+                results[name] = result = self.run_scenario(path, requests, options['cache'])
+                self.stdout.write(
+                    f'{name:>40} {result["throughput"]:>8.1f} {result["p50_ms"]:>8.2f} {result["p95_ms"]:>8.2f} '
+                    f'{result["p99_ms"]:>8.2f} {result["queries"]:>7} {result["peak_memory_kib"]:>9} '
+                    f'{result["errors"]:>6}'
+                )
+
+        report = {'metadata': self.get_metadata(options), 'results': results}
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+        self.stdout.write(f'Wrote {options["output"]}')
+
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)
+            regressions = self.compare(baseline, report, options['threshold'])
+            if regressions:
+                raise CommandError(f'{regressions} scenario(s) regressed beyond the threshold.')
+
+    def get_samples(self):
+        """A deterministic mid-table row of each resource, so runs over the same seed hit the same rows."""
+        samples = {}
+        for name, model in RESOURCE_MODELS.items():
+            count = model.objects.count()
+            samples[name] = model.objects.order_by('pk').values_list('pk', flat=True)[count // 2] if count else 0
+        # The most reviewed teacher has the deepest nested review list.
+        busiest = Teacher.objects.filter(review_stats__isnull=False).order_by('-review_stats__review_count', 'pk')
+        samples['teacher_pk'] = busiest.values_list('pk', flat=True).first() or samples['teachers']
+        samples['teacher-reviews'] = Review.objects.filter(
+            teacher_id=samples['teacher_pk']
+        ).order_by('pk').values_list('pk', flat=True).first() or 0
+        return samples
+
+    def get_scenarios(self):
+        """(name, path, streaming) for every GET route, followed by the query string variants."""
+        samples = self.get_samples()
+        paths = {}
+        for name, groups in get_routes():
+            kwargs = {}
+            for group in groups:
+                kwargs[group] = samples['teacher_pk'] if group == 'teacher_pk' else samples[get_resource(name)]
+            paths[name] = reverse(name, kwargs=kwargs)
+            yield name, paths[name], is_export(name)
+
+        students_page = max(1, Student.objects.count() // DefaultPagination.page_size // 2)
+        variants = [
+            ('students-list', f'page={students_page}', False),
+            ('students-list', 'expand=curator', False),
+            ('students-list', 'status=URGENT', False),
+            ('students-list', 'ordering=-last_name', False),
+            ('curators-list', 'search=Anna', False),
+            ('curators-list', 'stream=1', True),
+            ('teachers-list', 'ordering=-review_count', False),
+            ('teachers-list', 'search=patient', False),
+            ('group_sessions-list', 'search=mock', False),
+            ('teacher-reviews-list', 'search=helpful', False),
+        ]
+        for name, query, streaming in variants:
+            if name in paths:
+                yield f'{name}?{query}', f'{paths[name]}?{query}', streaming
+
+        # A cursor a few pages in, where a keyset predicate replaces the offset.
+        if 'teacher-reviews-list' in paths:
+            path = paths['teacher-reviews-list']
+            for _ in range(3):
+                response = self.client.get(path, headers=self.headers)
+                if response.status_code != 200 or not response.json().get('next'):
+                    break
+                path = response.json()['next'].removeprefix('http://testserver')
+            yield 'teacher-reviews-list?cursor', path, False
+
+    def request(self, path):
+        response = self.client.get(path, headers=self.headers)
+        # Streaming bodies are produced while they are read.
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, len(body)
+
+    def run_scenario(self, path, requests, cache_mode):
+        response_cache = cache.get_cache()
+        connection = connections[router.db_for_read(Student)]
+
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # The untimed first request warms the URL resolver and, for --cache warm, the response. Queries are
+        # counted with a wrapper because every request resets connection.queries.
+        response_cache.clear()
+        with connection.execute_wrapper(count_query):
+            status_code, size = self.request(path)
+
+        if cache_mode == 'cold':
+            response_cache.clear()
+        tracemalloc.start()
+        self.request(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings, errors = [], 0
+        for _ in range(requests):
+            if cache_mode == 'cold':
+                response_cache.clear()
+            start = time.perf_counter()
+            response_status, _ = self.request(path)
+            timings.append(time.perf_counter() - start)
+            errors += response_status != 200
+
+        return {
+            'path': path,
+            'status': status_code,
+            'bytes': size,
+            'requests': requests,
+            'errors': errors,
+            'throughput': round(len(timings) / sum(timings), 2),
+            'p50_ms': round(statistics.median(timings) * 1000, 3),
+            'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'mean_ms': round(statistics.mean(timings) * 1000, 3),
+            'queries': len(queries),
+            'peak_memory_kib': peak // 1024,
+        }
+
+    def get_metadata(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR
+            ).stdout.strip() or None
+        except OSError:
+            commit = None
+        connection = connections[router.db_for_read(Student)]
+        return {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'commit': commit,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'debug': settings.DEBUG,
+            'rows': {name: model.objects.count() for name, model in RESOURCE_MODELS.items()},
+            'options': {key: options[key] for key in ('requests', 'export_requests', 'cache', 'only')},
+            # ru_maxrss is in KiB on Linux.
+            'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+
+    def compare(self, baseline, report, threshold):
+        if baseline['metadata'].get('rows') != report['metadata']['rows']:
+            self.stderr.write('Row counts differ from the baseline; the comparison is not like for like.')
+        if baseline['metadata'].get('options') != report['metadata']['options']:
+            self.stderr.write('Options differ from the baseline; the comparison is not like for like.')
+        self.stdout.write(f'{"scenario":>40} {"p95 ms":>17} {"change":>8} {"queries":>9}')
+        regressions = 0
+        for name, result in report['results'].items():
+            old = baseline['results'].get(name)
+            if old is None:
+                continue
+            change = result['p95_ms'] / old['p95_ms'] - 1 if old['p95_ms'] else 0
+            regressed = change > threshold or result['queries'] > old['queries']
+            regressions += regressed
+            self.stdout.write(
+                f'{name:>40} {old["p95_ms"]:>8.2f}>{result["p95_ms"]:>8.2f} {change:>+8.0%} '
+                f'{old["queries"]:>4}>{result["queries"]:>4}{"  REGRESSED" if regressed else ""}'
+            )
+        return regressions
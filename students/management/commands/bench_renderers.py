@@ -0,0 +1,88 @@
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+from students.middleware import CompressionMiddleware, brotli
+from students.renderers import ORJSONRenderer
+
+RENDERERS = {
+    'json': JSONRenderer(),
+    'orjson': ORJSONRenderer(),
+}
+
+
+def student_rows(size):
+    return [
+        {
+            'id': i, 'course': 20 + i % 10, 'curator': f'http://localhost/ielts/curators/{i % 50}/',
+            'first_name': 'Maria', 'last_name': f'Ivanova{i}', 'phone': f'+7900{i:07d}',
+            'email': f'student{i}@mail.ru', 'skype_name': '', 'ielts_module': 'A',
+            'goal_score': Decimal('6.5'), 'exam_date': date(2024, 1, 1) + timedelta(days=i % 365),
+            'package': 'S', 'status': 'REGULAR',
+        }
+        for i in range(size)
+    ]
+
+
+def teacher_rows(size):
+    return [
+        {
+            'id': i, 'first_name': 'Olga', 'last_name': f'Petrova{i}', 'phone': f'+7700{i:07d}',
+            'email': f'teacher{i}@mail.ru', 'skype_name': '',
+            'about_me': 'Certified IELTS examiner with ten years of speaking and writing practice. ' * 4,
+            'groupsessions': list(range(i % 5)), 'review_count': i * 3, 'last_review_date': '2024-05-01',
+            'recent_review_count': i % 7,
+        }
+        for i in range(size)
+    ]
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings), statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare encode time of the stdlib and orjson renderers, and the size and cost of gzip and brotli '
+        'at the levels CompressionMiddleware uses, on in-memory student and teacher pages.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        codings = {'gzip': lambda content: compress_string(content, max_random_bytes=0)}
+        if brotli is not None:
+            codings['br'] = lambda content: brotli.compress(content, quality=CompressionMiddleware.brotli_quality)
+
+        self.stdout.write(f'{"rows":>14} {"renderer":>8} {"best ms":>10} {"median ms":>10} {"us/row":>8}')
+        bodies = {}
+        for name, get_rows in (('students', student_rows), ('teachers', teacher_rows)):
+            for size in options['sizes']:
+                rows = get_rows(size)
+                for renderer_name, renderer in RENDERERS.items():
+                    body, best, median = best_of(options['repeat'], lambda: renderer.render(rows))
+                    bodies[name, size] = body
+                    self.stdout.write(
+                        f'{f"{name} {size}":>14} {renderer_name:>8} {best * 1000:>10.2f} {median * 1000:>10.2f} '
+                        f'{best / size * 10 ** 6:>8.2f}'
+                    )
+
+        self.stdout.write(f'\n{"rows":>14} {"coding":>8} {"bytes":>10} {"saved":>7} {"best ms":>10}')
+        for (name, size), body in bodies.items():
+            self.stdout.write(f'{f"{name} {size}":>14} {"identity":>8} {len(body):>10} {"":>7} {"":>10}')
+            for coding, compress in codings.items():
+                compressed, best, _ = best_of(options['repeat'], lambda: compress(body))
+                self.stdout.write(
+                    f'{f"{name} {size}":>14} {coding:>8} {len(compressed):>10} '
+                    f'{1 - len(compressed) / len(body):>7.1%} {best * 1000:>10.2f}'
+                )
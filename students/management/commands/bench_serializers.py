@@ -0,0 +1,60 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from students.models import Curator, Student
+from students.serializers import CuratorSerializer, StudentSerializer
+
+
+class HyperlinkedStudentSerializer(StudentSerializer):
+    curator = serializers.HyperlinkedRelatedField(
+        queryset=Curator.objects.all(),
+        view_name='curators-detail'
+    )
+
+
+class EmbeddedStudentSerializer(StudentSerializer):
+    curator_id = serializers.IntegerField(read_only=True)
+    curator = CuratorSerializer(read_only=True)
+
+    class Meta(StudentSerializer.Meta):
+        fields = ['id', 'course', 'curator_id', 'curator', 'first_name', 'last_name', 'status']
+
+
+SERIALIZERS = {
+    'hyperlinked': HyperlinkedStudentSerializer,
+    'templated': StudentSerializer,
+    'embedded': EmbeddedStudentSerializer,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare list rendering cost of the student curator representations on in-memory pages.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/ielts/students/', HTTP_HOST='localhost'))
+        curators = [Curator(id=i, name=f'curator{i}', phone=str(i)) for i in range(1, 51)]
+
+        self.stdout.write(f'{"size":>8} {"serializer":>12} {"best ms":>10} {"median ms":>10} {"us/row":>8}')
+        for size in options['sizes']:
+            students = [
+                Student(id=i, course=20 + i % 10, curator=curators[i % len(curators)], first_name='a', last_name='b')
+                for i in range(1, size + 1)
+            ]
+            for name, serializer_class in SERIALIZERS.items():
+                timings = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    serializer_class(students, many=True, context={'request': request}).data
+                    timings.append(time.perf_counter() - start)
+                best = min(timings)
+                self.stdout.write(
+                    f'{size:>8} {name:>12} {best * 1000:>10.2f} {statistics.median(timings) * 1000:>10.2f} '
+                    f'{best / size * 10 ** 6:>8.2f}'
+                )
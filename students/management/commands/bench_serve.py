@@ -0,0 +1,117 @@
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+from .bench_async import percentile
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f'Server on port {port} did not start.')
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput and latency of runserver against the prefork `serve` command over real HTTP.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/ielts/curators/')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--workers', type=int, help='Passed to `serve`; defaults to its own sizing.')
+        parser.add_argument('--threads', type=int, help='Passed to `serve`.')
+        parser.add_argument('--asgi', action='store_true', help='Also benchmark `serve --asgi`.')
+        parser.add_argument('--username', help='User to authenticate as; defaults to the first active user.')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        user = users.filter(username=options['username']).first() if options['username'] else users.first()
+        if user is None:
+            raise CommandError('No active user to authenticate as.')
+        self.headers = {'Authorization': f'JWT {AccessToken.for_user(user)}', 'Host': 'localhost'}
+
+        serve = ['serve']
+        if options['workers']:
+            serve += ['--workers', str(options['workers'])]
+        if options['threads']:
+            serve += ['--threads', str(options['threads'])]
+        servers = {
+            'runserver': lambda port: ['runserver', '--noreload', f'127.0.0.1:{port}'],
+            'serve': lambda port: serve + ['--bind', f'127.0.0.1:{port}'],
+        }
+        if options['asgi']:
+            servers['serve --asgi'] = lambda port: serve + ['--asgi', '--bind', f'127.0.0.1:{port}']
+
+        self.stdout.write(f'{"server":>14} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>6}')
+        for name, get_args in servers.items():
+            port = free_port()
+            log = tempfile.TemporaryFile()
+            process = subprocess.Popen(
+                [sys.executable, sys.argv[0], *get_args(port), *self.get_settings_args()],
+                stdout=log, stderr=subprocess.STDOUT
+            )
+            try:
+                wait_for(port)
+                self.load(port, options, warmup=True)
+                start = time.perf_counter()
+                timings, errors = self.load(port, options)
+                elapsed = time.perf_counter() - start
+            finally:
+                process.terminate()
+                process.wait()
+                log.close()
+            self.stdout.write(
+                f'{name:>14} {len(timings) / elapsed:>8.1f} {statistics.median(timings) * 1000:>8.2f} '
+                f'{percentile(timings, 0.95) * 1000:>8.2f} {percentile(timings, 0.99) * 1000:>8.2f} {errors:>6}'
+            )
+
+    def get_settings_args(self):
+        settings_module = os.environ.get('DJANGO_SETTINGS_MODULE')
+        return [f'--settings={settings_module}'] if settings_module else []
+
+    def load(self, port, options, warmup=False):
+        total = options['concurrency'] if warmup else options['requests']
+        per_client = max(1, total // options['concurrency'])
+
+        def client(_):
+            # Every client holds one keep-alive connection, as a browser or upstream proxy would.
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            timings, errors = [], 0
+            for _ in range(per_client):
+                start = time.perf_counter()
+                try:
+                    connection.request('GET', options['path'], headers=self.headers)
+                    response = connection.getresponse()
+                    response.read()
+                    errors += response.status != 200
+                    if response.getheader('Connection', '').lower() == 'close':
+                        connection.close()
+                except (OSError, http.client.HTTPException):
+                    errors += 1
+                    connection.close()
+                timings.append(time.perf_counter() - start)
+            connection.close()
+            return timings, errors
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(client, range(options['concurrency'])))
+        return [timing for timings, _ in results for timing in timings], sum(errors for _, errors in results)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from students.models import TeacherReviewStats
+
+
+class Command(BaseCommand):
+    help = (
+        "Slide every teacher's recent review count to today's window. Schedule it shortly after midnight, "
+        'so teacher reads never run the refresh themselves.'
+    )
+
+    def handle(self, *args, **options):
+        updated = TeacherReviewStats.refresh_recent_daily(force=True)
+        self.stdout.write(f'Refreshed {updated} teacher review rollups.')
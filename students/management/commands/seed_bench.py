@@ -0,0 +1,199 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.utils import timezone
+from students import cache, search
+from students.models import Curator, CuratorWorkload, Student, Teacher, TeacherReviewStats, GroupSession, Review
+
+FIRST_NAMES = ['Anna', 'Boris', 'Dina', 'Egor', 'Farida', 'Gleb', 'Irina', 'Kamila', 'Lev', 'Maria', 'Nikita',
+               'Olga', 'Pavel', 'Rustam', 'Sofia', 'Timur', 'Ulyana', 'Vera', 'Yuri', 'Zarina']
+LAST_NAMES = ['Abramov', 'Belova', 'Volkov', 'Gromova', 'Davydov', 'Egorova', 'Zhukov', 'Ivanova', 'Kozlov',
+              'Lebedeva', 'Morozov', 'Novikova', 'Orlov', 'Petrova', 'Romanov', 'Smirnova', 'Tarasov', 'Fedorova',
+              'Khan', 'Sharipova']
+WORDS = ['essay', 'speaking', 'listening', 'reading', 'writing', 'band', 'score', 'feedback', 'grammar', 'vocabulary',
+         'lesson', 'mock', 'test', 'task', 'fluency', 'coherence', 'great', 'helpful', 'patient', 'clear']
+
+DEFAULT_COUNTS = {
+    'curators': 5000,
+    'students': 500000,
+    'teachers': 2000,
+    'group_sessions': 1000,
+    'reviews': 1000000,
+}
+BENCH_USERNAME = 'bench'
+
+
+@contextmanager
+def explicit_review_dates():
+    # `date` is auto_now_add, which would stamp every seeded review with today.
+    field = Review._meta.get_field('date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed deterministic benchmark volumes with bulk_create, then rebuild the rollups, search indexes and '
+        'table statistics that bulk writes bypass.'
+    )
+
+    def add_arguments(self, parser):
+        for name, count in DEFAULT_COUNTS.items():
+            parser.add_argument(f'--{name.replace("_", "-")}', type=int, default=count)
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiply every volume, e.g. 0.01 for a smoke run.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true', help='Delete all existing course data first.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.today = timezone.localdate()
+        counts = {name: max(1, int(options[name] * options['scale'])) for name in DEFAULT_COUNTS}
+
+        if options['flush']:
+            self.flush()
+        elif Curator.objects.exists() or Teacher.objects.exists():
+            raise CommandError('The database already has course data; pass --flush to replace it.')
+
+        with transaction.atomic():
+            curator_ids = self.timed('curators', lambda: self.seed_curators(counts['curators']))
+            self.timed('students', lambda: self.seed_students(counts['students'], curator_ids))
+            teacher_ids = self.timed('teachers', lambda: self.seed_teachers(counts['teachers']))
+            self.timed('group_sessions', lambda: self.seed_group_sessions(counts['group_sessions'], teacher_ids))
+            with explicit_review_dates():
+                self.timed('reviews', lambda: self.seed_reviews(counts['reviews'], teacher_ids))
+            self.timed('rollups', lambda: self.rebuild_rollups(curator_ids, teacher_ids))
+            self.timed('search indexes', self.rebuild_search_indexes)
+            User.objects.filter(username=BENCH_USERNAME).delete()
+            User.objects.create_user(BENCH_USERNAME, is_staff=True)
+        self.timed('statistics', self.analyze)
+        cache.invalidate(*(model._meta.label for model in (Curator, Student, Teacher, GroupSession, Review)))
+
+    def timed(self, label, seed):
+        start = time.perf_counter()
+        result = seed()
+        self.stdout.write(f'{label:>16}: {time.perf_counter() - start:.1f}s')
+        return result
+
+    def flush(self):
+        with transaction.atomic():
+            for model in (Review, GroupSession.teacher.through, GroupSession, Student, Teacher, Curator):
+                # A raw delete skips the per-row signals, which would take hours at these volumes.
+                model.objects.all()._raw_delete(router.db_for_write(model))
+            CuratorWorkload.objects.all().delete()
+            TeacherReviewStats.objects.all().delete()
+
+    def create(self, model, rows):
+        """bulk_create `rows` in batches without holding them all in memory, returning the new primary keys."""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+        return list(model.objects.order_by('pk').values_list('pk', flat=True))
+
+    def name(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    def text(self, words):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(words))
+
+    def seed_curators(self, count):
+        return self.create(Curator, (
+            Curator(name=' '.join(self.name()), phone=f'+7800{i:07d}') for i in range(count)
+        ))
+
+    def seed_students(self, count, curator_ids):
+        def rows():
+            for i in range(count):
+                first_name, last_name = self.name()
+                exam_date = None
+                if self.rng.random() < 0.8:
+                    exam_date = self.today + timedelta(days=self.rng.randint(-365, 365))
+                yield Student(
+                    course=self.rng.randint(20, 40),
+                    curator_id=self.rng.choice(curator_ids),
+                    first_name=first_name,
+                    last_name=last_name,
+                    phone=f'+7900{i:07d}',
+                    email=f'student{i}@bench.example',
+                    ielts_module=self.rng.choice([choice for choice, _ in Student.MODULE_CHOICES]),
+                    goal_score=self.rng.choice(['6.0', '6.5', '7.0', '7.5', '8.0']),
+                    exam_date=exam_date,
+                    package=self.rng.choice([choice for choice, _ in Student.PACKAGE_CHOICES]),
+                )
+        self.create(Student, rows())
+
+    def seed_teachers(self, count):
+        def rows():
+            for i in range(count):
+                first_name, last_name = self.name()
+                yield Teacher(
+                    first_name=first_name,
+                    last_name=last_name,
+                    phone=f'+7700{i:07d}',
+                    email=f'teacher{i}@bench.example',
+                    about_me=self.text(30),
+                )
+        return self.create(Teacher, rows())
+
+    def seed_group_sessions(self, count, teacher_ids):
+        session_ids = self.create(GroupSession, (
+            GroupSession(title=self.text(3)[:40], description=self.text(20)) for _ in range(count)
+        ))
+        Through = GroupSession.teacher.through
+        self.create(Through, (
+            Through(groupsession_id=session_id, teacher_id=teacher_id)
+            for session_id in session_ids
+            for teacher_id in self.rng.sample(teacher_ids, min(len(teacher_ids), self.rng.randint(1, 3)))
+        ))
+
+    def seed_reviews(self, count, teacher_ids):
+        # A few popular teachers collect most reviews, as on the real site.
+        weights = [1 / (rank + 1) for rank in range(len(teacher_ids))]
+        chosen = iter(self.rng.choices(teacher_ids, weights, k=count))
+        self.create(Review, (
+            Review(
+                teacher_id=next(chosen),
+                name=' '.join(self.name()),
+                description=self.text(25),
+                date=self.today - timedelta(days=self.rng.randint(0, 730)),
+            )
+            for _ in range(count)
+        ))
+
+    def rebuild_rollups(self, curator_ids, teacher_ids):
+        for start in range(0, len(curator_ids), self.batch_size):
+            CuratorWorkload.rebuild(curator_ids[start:start + self.batch_size])
+        for start in range(0, len(teacher_ids), self.batch_size):
+            TeacherReviewStats.rebuild(teacher_ids[start:start + self.batch_size])
+
+    def rebuild_search_indexes(self):
+        for label, fields in search.SEARCH_INDEXES.items():
+            model = apps.get_model(label)
+            using = router.db_for_write(model)
+            backend = search.get_backend(using)
+            if backend:
+                backend.rebuild(model, fields, using)
+
+    def analyze(self):
+        # Fresh statistics for the planner and for CachedCountPaginator's row estimates.
+        connection = connections[router.db_for_write(Student)]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+            elif connection.vendor == 'mysql':
+                tables = [model._meta.db_table for model in (Curator, Student, Teacher, GroupSession, Review)]
+                cursor.execute(f'ANALYZE TABLE {", ".join(map(connection.ops.quote_name, tables))}')
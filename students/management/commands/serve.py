@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from students.db import pool
+
+
+def default_workers():
+    return int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+
+def close_connections(server, worker=None):
+    # A connection opened in the master must not be shared by forked workers.
+    connections.close_all()
+    pool.close_idle()
+
+
+class Command(BaseCommand):
+    help = (
+        'Serve the project with a prefork gunicorn server. The application is loaded in the master '
+        'before workers fork, so they share its memory copy-on-write. Send HUP to restart workers '
+        'gracefully with new settings, or USR2 followed by TERM to the old master to load new code '
+        'without dropping connections.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bind', default=os.environ.get('BIND', '0.0.0.0:8000'))
+        parser.add_argument(
+            '--workers', type=int, default=default_workers(),
+            help='Worker processes; defaults to $WEB_CONCURRENCY or 2 * CPUs + 1.'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=int(os.environ.get('WEB_THREADS', 2)),
+            help='Threads per WSGI worker; more than one also enables keep-alive.'
+        )
+        parser.add_argument('--asgi', action='store_true', help='Run the ASGI application in uvicorn workers.')
+        parser.add_argument('--keepalive', type=int, default=5, help='Seconds to hold idle keep-alive connections.')
+        parser.add_argument('--timeout', type=int, default=30)
+        parser.add_argument('--graceful-timeout', type=int, default=30)
+        parser.add_argument(
+            '--max-requests', type=int, default=0,
+            help='Recycle a worker after this many requests, with 10%% jitter; 0 disables.'
+        )
+        parser.add_argument('--backlog', type=int, default=2048)
+        parser.add_argument('--pid', help='Write the master PID to this file, for reload signals.')
+        parser.add_argument('--no-preload', action='store_false', dest='preload')
+
+    def handle(self, *args, **options):
+        try:
+            from gunicorn.app.base import BaseApplication
+        except ImportError:
+            raise CommandError('gunicorn is not installed.')
+
+        if options['asgi']:
+            from django.core.asgi import get_asgi_application as get_application
+            worker_class = 'uvicorn_worker.UvicornWorker'
+        else:
+            from django.core.wsgi import get_wsgi_application as get_application
+            worker_class = 'gthread' if options['threads'] > 1 else 'sync'
+
+        config = {
+            'bind': options['bind'],
+            'workers': options['workers'],
+            'threads': options['threads'],
+            'worker_class': worker_class,
+            'keepalive': options['keepalive'],
+            'timeout': options['timeout'],
+            'graceful_timeout': options['graceful_timeout'],
+            'max_requests': options['max_requests'],
+            'max_requests_jitter': options['max_requests'] // 10,
+            'backlog': options['backlog'],
+            'pidfile': options['pid'],
+            'preload_app': options['preload'],
+            'pre_fork': close_connections,
+            'accesslog': '-',
+            'errorlog': '-',
+        }
+
+        class Server(BaseApplication):
+            def load_config(self):
+                for key, value in config.items():
+                    if value is not None:
+                        self.cfg.set(key, value)
+
+            def load(self):
+                application = get_application()
+                # Import every view, serializer and template tag now rather than on each worker's first request.
+                from django.urls import get_resolver
+                get_resolver().url_patterns
+                return application
+
+        self.stdout.write(f'Serving on {options["bind"]} with {options["workers"]} {worker_class} workers')
+        Server().run()
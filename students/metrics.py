@@ -0,0 +1,175 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from . import authentication, cache
+from .db import pool
+
+PREFIX = 'ielts_'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Context variables follow a request into the threads sync_to_async runs it on.
+current_sample = ContextVar('current_sample', default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One count per bucket plus the +Inf overflow; made cumulative on export.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Sample:
+    """Measurements of one sampled request."""
+    __slots__ = ('queries', 'sql_seconds', 'serialization_seconds', 'render_start')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.render_start = None
+
+    def execute(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - start
+            self.queries += 1
+
+    def timed_serialization(self, to_representation):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return to_representation(*args, **kwargs)
+            finally:
+                self.serialization_seconds += time.perf_counter() - start
+        return wrapper
+
+    def start_render(self, response):
+        self.render_start = time.perf_counter()
+        response.add_post_render_callback(self.end_render)
+        return response
+
+    def end_render(self, response):
+        self.serialization_seconds += time.perf_counter() - self.render_start
+
+
+class Registry:
+    """
+    In-process aggregates of sampled requests, labelled by route and action.
+
+    Each worker process keeps its own; observations are a few dict lookups
+    and integer increments under one lock.
+    """
+    HISTOGRAMS = {
+        'http_request_duration_seconds': ('Total request latency.', LATENCY_BUCKETS),
+        'db_queries_per_request': ('SQL queries per request.', QUERY_COUNT_BUCKETS),
+        'db_query_duration_seconds': ('Time per request spent in SQL.', LATENCY_BUCKETS),
+        'serialization_duration_seconds': (
+            'Time per request spent serializing and rendering the response body.', LATENCY_BUCKETS
+        ),
+    }
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.histograms = {name: {} for name in self.HISTOGRAMS}
+
+    def observe(self, route, action, method, status_code, duration, sample):
+        values = {
+            'http_request_duration_seconds': duration,
+            'db_queries_per_request': sample.queries,
+            'db_query_duration_seconds': sample.sql_seconds,
+            'serialization_duration_seconds': sample.serialization_seconds,
+        }
+        labels = (route, action)
+        with self._lock:
+            key = (route, action, method, str(status_code))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for name, value in values.items():
+                histograms = self.histograms[name]
+                if labels not in histograms:
+                    histograms[labels] = Histogram(self.HISTOGRAMS[name][1])
+                histograms[labels].observe(value)
+
+    def render(self):
+        """The aggregates and the cache, authentication and pool counters in Prometheus text format 0.0.4."""
+        lines = []
+        with self._lock:
+            lines += header('http_requests_total', 'Sampled requests.', 'counter')
+            for (route, action, method, status_code), count in sorted(self.requests.items()):
+                lines.append(sample_line(
+                    'http_requests_total', count, route=route, action=action, method=method, status=status_code
+                ))
+            for name, (description, _) in self.HISTOGRAMS.items():
+                lines += header(name, description, 'histogram')
+                for (route, action), histogram in sorted(self.histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip([*histogram.buckets, '+Inf'], histogram.counts):
+                        cumulative += count
+                        lines.append(sample_line(f'{name}_bucket', cumulative, route=route, action=action, le=bound))
+                    lines.append(sample_line(f'{name}_sum', histogram.sum, route=route, action=action))
+                    lines.append(sample_line(f'{name}_count', histogram.count, route=route, action=action))
+
+        lines += header('response_cache_total', 'Response cache lookups by outcome.', 'counter')
+        for outcome, count in cache.stats.as_dict().items():
+            lines.append(sample_line('response_cache_total', count, outcome=outcome))
+        lines += header('auth_user_cache_total', 'Authenticated user cache lookups by outcome.', 'counter')
+        for outcome, count in authentication.stats.as_dict().items():
+            lines.append(sample_line('auth_user_cache_total', count, outcome=outcome))
+
+        pools = pool.get_stats()
+        lines += header('db_pool_events_total', 'Connection pool events.', 'counter')
+        for alias, stats in pools.items():
+            for event in ('checkouts', 'waits', 'timeouts', 'connects', 'reconnects'):
+                lines.append(sample_line('db_pool_events_total', stats[event], alias=alias, event=event))
+        lines += header('db_pool_connections', 'Connection pool size.', 'gauge')
+        for alias, stats in pools.items():
+            for state in ('size', 'idle', 'max_size'):
+                lines.append(sample_line('db_pool_connections', stats[state], alias=alias, state=state))
+        return '\n'.join(lines) + '\n'
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection; only sampled requests are timed."""
+    sample = current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    return sample.execute(execute, sql, params, many, context)
+
+
+def time_serializer(serializer):
+    """Count the time `serializer.data` takes towards the sampled request's serialization time."""
+    sample = current_sample.get()
+    if sample is not None:
+        serializer.to_representation = sample.timed_serialization(serializer.to_representation)
+    return serializer
+
+
+def header(name, description, kind):
+    return [f'# HELP {PREFIX}{name} {description}', f'# TYPE {PREFIX}{name} {kind}']
+
+
+def sample_line(name, value, **labels):
+    label_text = ','.join(f'{key}="{escape(value)}"' for key, value in labels.items())
+    return f'{PREFIX}{name}{{{label_text}}} {value}' if labels else f'{PREFIX}{name} {value}'
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+registry = Registry()
@@ -0,0 +1,307 @@
+import hashlib
+import random
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+from rest_framework.viewsets import ViewSetMixin
+from whitenoise.middleware import WhiteNoiseMiddleware
+from . import cache, metrics
+from .db import routers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise middleware that also runs natively under ASGI.
+
+    WhiteNoise is sync-only, which makes Django adapt every middleware and
+    view below it to sync, so async views would each run on a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL query count and time and response serialization
+    and rendering time of a sampled share of requests into
+    `metrics.registry`, labelled by URL name and viewset action.
+
+    METRICS_SAMPLE_RATE of 0 removes the middleware from the stack; other
+    unsampled requests cost one random() call. Streaming responses are
+    timed until the view returns them: producing their body, which happens
+    while they are sent, isn't measured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.is_sampled():
+            return self.get_response(request)
+        sample = metrics.Sample()
+        token = metrics.current_sample.set(sample)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_sample.reset(token)
+        self.observe(request, response, time.perf_counter() - start, sample)
+        return response
+
+    async def __acall__(self, request):
+        if not self.is_sampled():
+            return await self.get_response(request)
+        sample = metrics.Sample()
+        token = metrics.current_sample.set(sample)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_sample.reset(token)
+        self.observe(request, response, time.perf_counter() - start, sample)
+        return response
+
+    def is_sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def process_template_response(self, request, response):
+        # Runs last among the template response hooks, right before the body is rendered.
+        sample = metrics.current_sample.get()
+        return sample.start_render(response) if sample is not None else response
+
+    def observe(self, request, response, duration, sample):
+        match = request.resolver_match
+        if match is None:
+            route, action = 'unmatched', request.method.lower()
+        else:
+            route = match.view_name
+            actions = getattr(match.func, 'actions', None) or {}
+            action = actions.get(request.method.lower(), request.method.lower())
+        metrics.registry.observe(route, action, request.method, response.status_code, duration, sample)
+
+
+def parse_accept_encoding(header):
+    """Map each coding in an Accept-Encoding header to its quality value."""
+    qualities = {}
+    for part in header.split(','):
+        coding, *params = [item.strip() for item in part.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities
+
+
+def brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compresses compressible responses of at least COMPRESSION_MIN_SIZE bytes
+    with the coding the client prefers: brotli when the `brotli` package is
+    installed, otherwise gzip. Streaming responses are compressed chunk by
+    chunk. The response cache stores bodies uncompressed, so one entry
+    serves every coding.
+    """
+    sync_capable = True
+    async_capable = True
+    brotli_quality = 4
+    # Django's GZipMiddleware BREACH mitigation.
+    max_random_bytes = 100
+    compressible_types = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.codings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def get_coding(self, request):
+        qualities = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        best, best_quality = None, 0
+        for coding in self.codings:
+            quality = qualities.get(coding, qualities.get('*', 0))
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        return best
+
+    def is_compressible(self, response):
+        if response.has_header('Content-Encoding') or getattr(response, 'is_async', False):
+            return False
+        if not response.get('Content-Type', '').startswith(self.compressible_types):
+            return False
+        return response.streaming or len(response.content) >= self.min_size
+
+    def compress(self, request, response):
+        if not self.is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = self.get_coding(request)
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if coding == 'br':
+                response.streaming_content = brotli_sequence(response.streaming_content, self.brotli_quality)
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content, max_random_bytes=self.max_random_bytes
+                )
+            del response.headers['Content-Length']
+        else:
+            if coding == 'br':
+                content = brotli.compress(response.content, quality=self.brotli_quality)
+            else:
+                content = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        # A compressed body is a different representation of the same resource.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets GET, HEAD and OPTIONS requests to the `students` viewsets and the
+    admin changelists read from `DATABASE_REPLICAS` through
+    `students.db.routers.ReplicaRouter`; other requests stay on the primary.
+
+    A client whose request wrote reads from the primary for the next
+    DATABASE_REPLICA_PIN_SECONDS, so it sees its own writes while they
+    replicate. Clients are told apart by their Authorization header or
+    session cookie; the pins live in the response cache, which therefore
+    must be shared. Without replicas the middleware removes itself.
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+    replica_view_modules = ('students.views',)
+    pin_prefix = 'students:replica-pin:'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not routers.get_replicas():
+            raise MiddlewareNotUsed()
+        if cache.is_process_local():
+            # A pin set by the worker that wrote would be missed by the one serving the next read.
+            raise ImproperlyConfigured('Read replicas need a cache shared by all workers to pin clients that wrote.')
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = routers.RoutingState()
+        token = routers.current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.current_state.reset(token)
+        if state.wrote:
+            self.pin_client(request)
+        return response
+
+    async def __acall__(self, request):
+        state = routers.RoutingState()
+        token = routers.current_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.current_state.reset(token)
+        if state.wrote:
+            await sync_to_async(self.pin_client)(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = routers.current_state.get()
+        if state is None or request.method not in self.safe_methods or not self.is_replica_view(request, view_func):
+            return None
+        state.use_replicas = True
+        key = self.get_pin_key(request)
+        if key is not None and cache.get_cache().get(key):
+            state.pinned = True
+        return None
+
+    def is_replica_view(self, request, view_func):
+        match = request.resolver_match
+        if 'admin' in match.namespaces and match.url_name and match.url_name.endswith('_changelist'):
+            return True
+        view_class = getattr(view_func, 'cls', None)
+        return (
+            view_class is not None and issubclass(view_class, ViewSetMixin)
+            and view_class.__module__ in self.replica_view_modules
+        )
+
+    def get_pin_key(self, request):
+        client = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if not client:
+            return None
+        return self.pin_prefix + hashlib.sha256(client.encode()).hexdigest()
+
+    def pin_client(self, request):
+        key = self.get_pin_key(request)
+        if key is not None:
+            cache.get_cache().set(key, True, getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5))
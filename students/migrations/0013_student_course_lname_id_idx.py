@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0012_curator_user_student_user_teacher_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['course', 'last_name', 'id'], name='student_course_lname_id_idx'),
+        ),
+    ]
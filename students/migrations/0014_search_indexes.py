@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# The DDL is spelled out here rather than taken from students.search, so
+# that later changes to the search backends can't alter this migration.
+SEARCH_INDEXES = {
+    'students_curator': ['name'],
+    'students_teacher': ['first_name', 'last_name', 'about_me'],
+    'students_groupsession': ['title', 'description'],
+    'students_review': ['name', 'description'],
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    for table, fields in SEARCH_INDEXES.items():
+        index = quote(f'{table}_fts')
+        columns = ', '.join(quote(field) for field in fields)
+        if vendor == 'mysql':
+            schema_editor.execute(f'ALTER TABLE {quote(table)} ADD FULLTEXT INDEX {index} ({columns})')
+        elif vendor == 'sqlite':
+            # An FTS5 table mirroring the columns, keyed by the row's pk.
+            schema_editor.execute(f'CREATE VIRTUAL TABLE {index} USING fts5({columns})')
+            schema_editor.execute(f'INSERT INTO {index} (rowid, {columns}) SELECT id, {columns} FROM {quote(table)}')
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    for table in SEARCH_INDEXES:
+        index = quote(f'{table}_fts')
+        if vendor == 'mysql':
+            schema_editor.execute(f'ALTER TABLE {quote(table)} DROP INDEX {index}')
+        elif vendor == 'sqlite':
+            schema_editor.execute(f'DROP TABLE {index}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0013_student_course_lname_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
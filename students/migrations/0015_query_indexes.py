@@ -0,0 +1,69 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:06
+
+from django.db import migrations, models
+
+# SQLite's LIKE is case-insensitive and can only use an index declared with
+# the NOCASE collation for `istartswith`; MySQL's case-insensitive collations
+# serve those lookups from the plain indexes above.
+NOCASE_INDEXES = {
+    'students_curator': ['name'],
+    'students_student': ['last_name', 'phone'],
+    'students_teacher': ['first_name', 'last_name'],
+    'students_groupsession': ['title'],
+}
+
+
+def create_nocase_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        quote = schema_editor.quote_name
+        for table, columns in NOCASE_INDEXES.items():
+            for column in columns:
+                schema_editor.execute(
+                    f'CREATE INDEX {quote(f"{table}_{column}_nocase")} ON {quote(table)} ({quote(column)} COLLATE NOCASE)'
+                )
+
+
+def drop_nocase_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for table, columns in NOCASE_INDEXES.items():
+            for column in columns:
+                schema_editor.execute(f'DROP INDEX {schema_editor.quote_name(f"{table}_{column}_nocase")}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0014_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='curator',
+            index=models.Index(fields=['name'], name='curator_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='groupsession',
+            index=models.Index(fields=['title'], name='groupsession_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['curator', 'course', 'last_name'], name='student_curator_course_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['exam_date'], name='student_exam_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_name'], name='student_last_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['first_name', 'last_name'], name='teacher_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['last_name'], name='teacher_last_name_idx'),
+        ),
+        migrations.RunPython(create_nocase_indexes, drop_nocase_indexes),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Q
+
+
+def populate_workloads(apps, schema_editor):
+    Curator = apps.get_model('students', 'Curator')
+    Student = apps.get_model('students', 'Student')
+    CuratorWorkload = apps.get_model('students', 'CuratorWorkload')
+    db = schema_editor.connection.alias
+    rows = {
+        row.pop('curator_id'): row
+        for row in Student.objects.using(db).order_by().values('curator_id').annotate(
+            student_count=Count('id'),
+            basic_count=Count('id', filter=Q(package='B')),
+            standard_count=Count('id', filter=Q(package='S')),
+            vip_count=Count('id', filter=Q(package='V')),
+            general_count=Count('id', filter=Q(ielts_module='G')),
+            academic_count=Count('id', filter=Q(ielts_module='A')),
+        )
+    }
+    CuratorWorkload.objects.using(db).bulk_create(
+        [CuratorWorkload(curator_id=pk, **rows.get(pk, {})) for pk in Curator.objects.using(db).values_list('id', flat=True)],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0015_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CuratorWorkload',
+            fields=[
+                ('curator', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='workload', serialize=False, to='students.curator')),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('basic_count', models.PositiveIntegerField(default=0)),
+                ('standard_count', models.PositiveIntegerField(default=0)),
+                ('vip_count', models.PositiveIntegerField(default=0)),
+                ('general_count', models.PositiveIntegerField(default=0)),
+                ('academic_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_workloads, migrations.RunPython.noop),
+    ]
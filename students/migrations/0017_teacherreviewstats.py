@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+
+def populate_review_stats(apps, schema_editor):
+    Teacher = apps.get_model('students', 'Teacher')
+    Review = apps.get_model('students', 'Review')
+    TeacherReviewStats = apps.get_model('students', 'TeacherReviewStats')
+    db = schema_editor.connection.alias
+    today = timezone.localdate()
+    rows = {
+        row.pop('teacher_id'): row
+        for row in Review.objects.using(db).order_by().values('teacher_id').annotate(
+            review_count=Count('id'),
+            last_review_date=Max('date'),
+            recent_review_count=Count('id', filter=Q(date__gt=today - settings.TEACHER_RECENT_REVIEW_WINDOW)),
+        )
+    }
+    TeacherReviewStats.objects.using(db).bulk_create(
+        [
+            TeacherReviewStats(teacher_id=pk, recent_as_of=today, **rows.get(pk, {}))
+            for pk in Teacher.objects.using(db).values_list('id', flat=True)
+        ],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0016_curatorworkload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeacherReviewStats',
+            fields=[
+                ('teacher', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_stats', serialize=False, to='students.teacher')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('last_review_date', models.DateField(blank=True, null=True)),
+                ('recent_review_count', models.PositiveIntegerField(default=0)),
+                ('recent_as_of', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['review_count'], name='teacher_review_count_idx'), models.Index(fields=['last_review_date'], name='teacher_last_review_idx'), models.Index(fields=['recent_review_count'], name='teacher_recent_review_idx'), models.Index(fields=['recent_as_of'], name='teacher_review_as_of_idx')],
+            },
+        ),
+        migrations.RunPython(populate_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0017_teacherreviewstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['teacher', 'date', 'id'], name='review_teacher_date_id_idx'),
+        ),
+    ]
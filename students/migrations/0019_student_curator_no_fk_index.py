@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Altering a column rebuilds the table on SQLite, which loses the NOCASE
+# indexes 0015_query_indexes created with raw SQL.
+NOCASE_COLUMNS = ['last_name', 'phone']
+
+
+def create_nocase_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        quote = schema_editor.quote_name
+        for column in NOCASE_COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX {quote(f"students_student_{column}_nocase")} '
+                f'ON {quote("students_student")} ({quote(column)} COLLATE NOCASE)'
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0018_review_teacher_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_nocase_indexes),
+        migrations.AlterField(
+            model_name='student',
+            name='curator',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, to='students.curator'),
+        ),
+        migrations.RunPython(create_nocase_indexes, migrations.RunPython.noop),
+    ]
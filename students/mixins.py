@@ -0,0 +1,390 @@
+import time
+from itertools import islice
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
+from rest_framework.settings import api_settings
+from . import cache, metrics
+from .db import routers
+from .exports import stream_csv
+from .renderers import NDJSONRenderer
+
+
+class StreamingListMixin:
+    """
+    Opt-in NDJSON list output (`Accept: application/x-ndjson`, `?format=ndjson`
+    or `?stream=1`) that serializes the queryset chunk by chunk.
+
+    `iterator(chunk_size=...)` runs the queryset's `prefetch_related` once per
+    chunk, so memory stays bounded by `stream_chunk_size` rows.
+    """
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    stream_chunk_size = 500
+    stream_query_param = 'stream'
+
+    def list(self, request, *args, **kwargs):
+        if self.wants_stream(request):
+            queryset = self.filter_queryset(self.get_queryset())
+            return StreamingHttpResponse(self.stream_rows(queryset), content_type=NDJSONRenderer.media_type)
+        return super().list(request, *args, **kwargs)
+
+    def wants_stream(self, request):
+        if request.query_params.get(self.stream_query_param) in ('1', 'true'):
+            return True
+        return isinstance(request.accepted_renderer, NDJSONRenderer)
+
+    def stream_rows(self, queryset):
+        renderer = NDJSONRenderer()
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while True:
+            chunk = list(islice(rows, self.stream_chunk_size))
+            if not chunk:
+                break
+            for row in self.get_serializer(chunk, many=True).data:
+                yield renderer.render_row(row)
+
+
+def get_model_path(model, source):
+    """The ORM lookup path of a dotted serializer `source`, or None if any part isn't a model field."""
+    path = []
+    for part in source.split('.'):
+        if model is None:
+            return None
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        path.append(part)
+        model = field.related_model
+    return LOOKUP_SEP.join(path)
+
+
+def get_select_related_paths(select_related, prefix=''):
+    for name, nested in select_related.items():
+        if nested:
+            yield from get_select_related_paths(nested, f'{prefix}{name}{LOOKUP_SEP}')
+        else:
+            yield prefix + name
+
+
+class SparseFieldsetMixin:
+    """
+    `?fields=a,b` and `?omit=c` on list and retrieve.
+
+    Dropped fields are removed from the serializer, and the queryset loads
+    only the columns the remaining fields read: `only()` for concrete
+    fields, and relations that no remaining field reaches are dropped from
+    `select_related` and `prefetch_related`. A remaining field whose source
+    isn't a model field may read anything, so it disables column pruning
+    unless `sparse_field_sources` lists the lookups it needs.
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    sparse_actions = ('list', 'retrieve')
+    sparse_field_sources = {}
+
+    def get_sparse_fields(self):
+        """The serializer fields to render, or None for all of them."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        if self.action not in self.sparse_actions:
+            return None
+        params = self.request.query_params
+        requested = {
+            param: [name for name in params.get(param, '').split(',') if name]
+            for param in (self.fields_query_param, self.omit_query_param)
+        }
+        if not any(requested.values()):
+            return None
+
+        self.sparse_serializer_fields = self.get_serializer_class()().fields
+        errors = {}
+        for param, names in requested.items():
+            unknown = [name for name in names if name not in self.sparse_serializer_fields]
+            if unknown:
+                errors[param] = [f'Unknown field(s): {", ".join(unknown)}.']
+        if errors:
+            raise ValidationError(errors)
+
+        selected = requested[self.fields_query_param] or list(self.sparse_serializer_fields)
+        omitted = requested[self.omit_query_param]
+        return [name for name in self.sparse_serializer_fields if name in selected and name not in omitted]
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            target = serializer.child if isinstance(serializer, ListSerializer) else serializer
+            for name in list(target.fields):
+                if name not in fields:
+                    target.fields.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        return queryset if fields is None else self.prune_queryset(queryset, fields)
+
+    def prune_queryset(self, queryset, fields):
+        model = queryset.model
+        paths = []
+        for name in fields:
+            if name in self.sparse_field_sources:
+                paths += self.sparse_field_sources[name]
+                continue
+            path = get_model_path(model, self.sparse_serializer_fields[name].source)
+            if path is None:
+                return queryset
+            paths.append(path)
+
+        roots = {path.split(LOOKUP_SEP)[0] for path in paths}
+        queryset = self.prune_relations(queryset, roots)
+
+        selected = queryset.query.select_related
+        if selected is True:
+            return queryset
+        columns = {model._meta.pk.name, *self.get_ordering_columns(queryset)}
+        for path in paths:
+            root = path.split(LOOKUP_SEP)[0]
+            field = model._meta.get_field(root)
+            if field.many_to_many or field.one_to_many:
+                # Prefetched by primary key.
+                continue
+            if not field.is_relation or (selected and root in selected):
+                columns.add(path)
+            elif field.concrete:
+                columns.add(root)
+        return queryset.only(*columns)
+
+    def prune_relations(self, queryset, roots):
+        lookups = queryset._prefetch_related_lookups
+        kept = [
+            lookup for lookup in lookups
+            if getattr(lookup, 'prefetch_through', lookup).split(LOOKUP_SEP)[0] in roots
+        ]
+        if len(kept) != len(lookups):
+            queryset = queryset.prefetch_related(None).prefetch_related(*kept)
+
+        if isinstance(queryset.query.select_related, dict):
+            related = list(get_select_related_paths(queryset.query.select_related))
+            kept = [path for path in related if path.split(LOOKUP_SEP)[0] in roots]
+            if len(kept) != len(related):
+                queryset = queryset.select_related(None)
+                if kept:
+                    queryset = queryset.select_related(*kept)
+        return queryset
+
+    def get_ordering_columns(self, queryset):
+        # Keyset pagination reads the ordering fields of boundary rows, so they stay loaded.
+        ordering = list(queryset.query.order_by)
+        paginator_ordering = getattr(self.paginator, 'ordering', None) or ()
+        ordering += [paginator_ordering] if isinstance(paginator_ordering, str) else paginator_ordering
+        for name in ordering:
+            if not isinstance(name, str):
+                continue
+            try:
+                field = queryset.model._meta.get_field(name.lstrip('-'))
+            except FieldDoesNotExist:
+                continue
+            if field.concrete:
+                yield field.name
+
+
+class Expansion:
+    """
+    A related resource `?expand=` can embed: the serializer fields that
+    render it and the one `select_related` path or `Prefetch` that loads it.
+    A Prefetch replaces any plain prefetch of the same relation.
+    """
+
+    def __init__(self, fields, select_related=None, prefetch=None):
+        self.fields = fields
+        self.select_related = select_related
+        self.prefetch = prefetch
+
+    def apply(self, queryset):
+        if self.select_related is not None:
+            return queryset.select_related(self.select_related)
+        lookups = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_to', lookup) != self.prefetch.prefetch_to
+        ]
+        return queryset.prefetch_related(None).prefetch_related(*lookups, self.prefetch)
+
+    def get_model(self, model):
+        if self.prefetch is not None:
+            return self.prefetch.queryset.model
+        for name in self.select_related.split(LOOKUP_SEP):
+            model = model._meta.get_field(name).related_model
+        return model
+
+
+_expanded_serializer_classes = {}
+
+
+class ExpandMixin:
+    """
+    `?expand=a,b` on list and retrieve embeds the related resources named
+    in `expansions`, each loaded by a single join or prefetch query, so a
+    page and its relations come back in a fixed number of queries.
+
+    Responses with expansions are also cached under the embedded models'
+    scopes, so they are invalidated when an embedded row changes.
+    """
+    expand_query_param = 'expand'
+    expand_actions = ('list', 'retrieve')
+    expansions = {}
+
+    def get_expansions(self):
+        """The requested expansion names, in declaration order."""
+        if not hasattr(self, '_expansions'):
+            self._expansions = self.parse_expansions()
+        return self._expansions
+
+    def parse_expansions(self):
+        if self.action not in self.expand_actions:
+            return []
+        names = [name for name in self.request.query_params.get(self.expand_query_param, '').split(',') if name]
+        unknown = [name for name in names if name not in self.expansions]
+        if unknown:
+            raise ValidationError({self.expand_query_param: [f'Unknown expansion(s): {", ".join(unknown)}.']})
+        return [name for name in self.expansions if name in names]
+
+    def get_serializer_class(self):
+        serializer_class = super().get_serializer_class()
+        names = tuple(self.get_expansions())
+        if not names:
+            return serializer_class
+        key = (type(self), serializer_class, names)
+        if key not in _expanded_serializer_classes:
+            _expanded_serializer_classes[key] = self.expand_serializer_class(serializer_class, names)
+        return _expanded_serializer_classes[key]
+
+    def expand_serializer_class(self, serializer_class, names):
+        fields = {}
+        for name in names:
+            fields.update(self.expansions[name].fields)
+        meta = type('Meta', (serializer_class.Meta,), {
+            'fields': [*serializer_class.Meta.fields, *(name for name in fields if name not in serializer_class.Meta.fields)]
+        })
+        return type(serializer_class.__name__, (serializer_class,), {**fields, 'Meta': meta})
+
+    def filter_queryset(self, queryset):
+        # Expanded before the rest of the chain, so sparse fieldsets can prune an expansion they omit.
+        for name in self.get_expansions():
+            queryset = self.expansions[name].apply(queryset)
+        return super().filter_queryset(queryset)
+
+    def get_cache_scopes(self):
+        model = super().get_serializer_class().Meta.model
+        scopes = super().get_cache_scopes()
+        for name in self.get_expansions():
+            label = self.expansions[name].get_model(model)._meta.label
+            if label not in scopes:
+                scopes.append(label)
+        return scopes
+
+
+class SerializationMetricsMixin:
+    """Times `serializer.data` of sampled requests into their serialization metrics."""
+
+    def get_serializer(self, *args, **kwargs):
+        return metrics.time_serializer(super().get_serializer(*args, **kwargs))
+
+
+class CSVExportMixin:
+    export_columns = None
+    export_filename = 'export.csv'
+
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return stream_csv(queryset, self.export_columns, self.export_filename)
+
+
+class CachedResponseMixin:
+    """
+    Caches rendered `list`/`retrieve` JSON responses and answers conditional
+    GETs.
+
+    Keys combine the path, query string, permission classes, media type and
+    the current version of every scope in `get_cache_scopes()`; the signals
+    in `students.signals` bump those versions on writes. The key doubles as a
+    strong ETag, so a matching `If-None-Match` gets a 304 before any
+    queryset is evaluated. There is no Last-Modified: two writes within a
+    second would share one, and `If-Modified-Since` would then answer 304
+    for a stale copy.
+
+    A response read from a replica within DATABASE_REPLICA_PIN_SECONDS of
+    the last change to its scopes may predate that change, so it is sent
+    without being cached or given validators.
+    """
+    cache_models = []
+
+    def get_cache_scopes(self):
+        return [model._meta.label for model in self.cache_models]
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(request) or super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(request) or super().retrieve(request, *args, **kwargs)
+
+    def is_cacheable(self, request):
+        if hasattr(self, 'wants_stream') and self.wants_stream(request):
+            return False
+        return isinstance(request.accepted_renderer, JSONRenderer)
+
+    def get_cached_response(self, request):
+        if not self.is_cacheable(request):
+            return None
+        versions = cache.get_versions(self.get_cache_scopes())
+        self.response_cache_key = cache.get_response_key(request, self.get_permissions(), versions)
+        self.response_etag = quote_etag(self.response_cache_key[len(cache.RESPONSE_PREFIX):])
+        self.response_version = max(versions) if versions else None
+
+        response = get_conditional_response(request, etag=self.response_etag)
+        if response is not None:
+            cache.stats.record('not_modified')
+            return self.set_validators(response)
+
+        cached = cache.get_cache().get(self.response_cache_key)
+        cache.stats.record('misses' if cached is None else 'hits')
+        if cached is None:
+            return None
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+        response['X-Cache'] = 'HIT'
+        return self.set_validators(response)
+
+    def set_validators(self, response):
+        response['ETag'] = self.response_etag
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, 'response_cache_key', None)
+        if key is not None and isinstance(response, Response) and response.status_code == 200 \
+                and not self.may_be_stale():
+            response.render()
+            cache.get_cache().set(key, (response.content, response['Content-Type']), cache.get_timeout())
+            response['X-Cache'] = 'MISS'
+            self.set_validators(response)
+        return response
+
+    def may_be_stale(self):
+        if self.response_version is None or not routers.used_replica():
+            return False
+        window = getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5) * 10 ** 9
+        return time.time_ns() - self.response_version < window
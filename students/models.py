@@ -1,6 +1,13 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import Case, When, Value, Q, F, Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.core.validators import MinValueValidator, EmailValidator, DecimalValidator
+from . import cache
+
+RECENT_REFRESH_PREFIX = 'students:recent-refresh:'
 
 
 class Curator(models.Model):
@@ -14,9 +21,50 @@ class Curator(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='curator_name_idx')
+        ]
+
+
+def get_status_bounds():
+    today = timezone.localdate()
+    return today, today + settings.STUDENT_URGENT_WINDOW
+
+
+class StudentQuerySet(models.QuerySet):
+    def with_status(self):
+        today, urgent_until = get_status_bounds()
+        return self.annotate(status=Case(
+            When(exam_date__isnull=True, then=Value(Student.STATUS_UNSCHEDULED)),
+            When(exam_date__lt=today, then=Value(Student.STATUS_FINISHED)),
+            When(exam_date__lt=urgent_until, then=Value(Student.STATUS_URGENT)),
+            default=Value(Student.STATUS_REGULAR),
+            output_field=models.CharField()
+        ))
+
+    def filter_status(self, status):
+        today, urgent_until = get_status_bounds()
+        conditions = {
+            Student.STATUS_UNSCHEDULED: Q(exam_date__isnull=True),
+            Student.STATUS_FINISHED: Q(exam_date__lt=today),
+            Student.STATUS_URGENT: Q(exam_date__gte=today, exam_date__lt=urgent_until),
+            Student.STATUS_REGULAR: Q(exam_date__gte=urgent_until),
+        }
+        return self.filter(conditions[status])
 
 
 class Student(models.Model):
+    STATUS_FINISHED = 'FINISHED'
+    STATUS_URGENT = 'URGENT'
+    STATUS_REGULAR = 'REGULAR'
+    STATUS_UNSCHEDULED = 'UNSCHEDULED'
+    STATUS_CHOICES = [
+        (STATUS_FINISHED, 'Finished'),
+        (STATUS_URGENT, 'Urgent'),
+        (STATUS_REGULAR, 'Regular'),
+        (STATUS_UNSCHEDULED, 'Unscheduled')
+    ]
+
     MODULE_GENERAL = 'G'
     MODULE_ACADEMIC = 'A'
     MODULE_CHOICES = [
@@ -34,7 +82,8 @@ class Student(models.Model):
     ]
 
     course = models.IntegerField(validators=[MinValueValidator(20)])
-    curator = models.ForeignKey(Curator, on_delete=models.PROTECT)
+    # student_curator_course_idx leads with the curator and serves its lookups.
+    curator = models.ForeignKey(Curator, on_delete=models.PROTECT, db_index=False)
     first_name = models.CharField(max_length=20)
     last_name = models.CharField(max_length=30)
     phone = models.CharField(max_length=40, unique=True)
@@ -50,13 +99,99 @@ class Student(models.Model):
     exam_date = models.DateField(null=True, blank=True)
     package = models.CharField(max_length=10, choices=PACKAGE_CHOICES, default=PACKAGE_STANDARD)
     user = models.OneToOneField(User, on_delete=models.CASCADE, blank=True, null=True)
-    objects = models.Manager()
+    objects = StudentQuerySet.as_manager()
 
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields() & {'curator_id', 'package', 'ielts_module'}:
+            instance._workload_key = instance.get_workload_key()
+        return instance
+
+    def get_workload_key(self):
+        return self.curator_id, self.package, self.ielts_module
+
+    def save(self, *args, **kwargs):
+        # Keeps the CuratorWorkload update from the save signals in the same transaction.
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(Student, instance=self)):
+            super().save(*args, **kwargs)
+
+    def get_status(self):
+        if hasattr(self, 'status'):
+            return self.status
+        today, urgent_until = get_status_bounds()
+        if self.exam_date is None:
+            return self.STATUS_UNSCHEDULED
+        if self.exam_date < today:
+            return self.STATUS_FINISHED
+        if self.exam_date < urgent_until:
+            return self.STATUS_URGENT
+        return self.STATUS_REGULAR
+
     class Meta:
         ordering = ['course', 'last_name']
+        indexes = [
+            models.Index(fields=['course', 'last_name', 'id'], name='student_course_lname_id_idx'),
+            models.Index(fields=['curator', 'course', 'last_name'], name='student_curator_course_idx'),
+            models.Index(fields=['exam_date'], name='student_exam_date_idx'),
+            models.Index(fields=['last_name'], name='student_last_name_idx')
+        ]
+
+
+class CuratorWorkload(models.Model):
+    PACKAGE_FIELDS = {
+        Student.PACKAGE_BASIC: 'basic_count',
+        Student.PACKAGE_STANDARD: 'standard_count',
+        Student.PACKAGE_VIP: 'vip_count'
+    }
+    MODULE_FIELDS = {
+        Student.MODULE_GENERAL: 'general_count',
+        Student.MODULE_ACADEMIC: 'academic_count'
+    }
+
+    curator = models.OneToOneField(Curator, on_delete=models.CASCADE, primary_key=True, related_name='workload')
+    student_count = models.PositiveIntegerField(default=0)
+    basic_count = models.PositiveIntegerField(default=0)
+    standard_count = models.PositiveIntegerField(default=0)
+    vip_count = models.PositiveIntegerField(default=0)
+    general_count = models.PositiveIntegerField(default=0)
+    academic_count = models.PositiveIntegerField(default=0)
+    objects = models.Manager()
+
+    def __str__(self):
+        return f'{self.curator_id}: {self.student_count}'
+
+    @classmethod
+    def apply(cls, key, delta):
+        curator_id, package, ielts_module = key
+        changes = {'student_count': F('student_count') + delta}
+        for field in (cls.PACKAGE_FIELDS.get(package), cls.MODULE_FIELDS.get(ielts_module)):
+            if field is not None:
+                changes[field] = F(field) + delta
+        if not cls.objects.filter(curator_id=curator_id).update(**changes):
+            cls.rebuild([curator_id])
+
+    @classmethod
+    def rebuild(cls, curator_ids):
+        """Recompute the counters of `curator_ids` from the student table in one UPDATE."""
+        counts = {'student_count': Q()}
+        counts.update({field: Q(package=package) for package, field in cls.PACKAGE_FIELDS.items()})
+        counts.update({field: Q(ielts_module=module) for module, field in cls.MODULE_FIELDS.items()})
+        students = Student.objects.filter(curator_id=OuterRef('curator_id')).order_by().values('curator_id')
+        changes = {
+            field: Coalesce(Subquery(students.filter(condition).annotate(count=Count('id')).values('count')), 0)
+            for field, condition in counts.items()
+        }
+        curator_ids = set(curator_ids)
+        if cls.objects.filter(curator_id__in=curator_ids).update(**changes) < len(curator_ids):
+            cls.objects.bulk_create(
+                [cls(curator_id=pk) for pk in Curator.objects.filter(pk__in=curator_ids).values_list('id', flat=True)],
+                ignore_conflicts=True
+            )
+            cls.objects.filter(curator_id__in=curator_ids).update(**changes)
 
 
 class Teacher(models.Model):
@@ -74,6 +209,10 @@ class Teacher(models.Model):
 
     class Meta:
         ordering = ['first_name', 'last_name']
+        indexes = [
+            models.Index(fields=['first_name', 'last_name'], name='teacher_name_idx'),
+            models.Index(fields=['last_name'], name='teacher_last_name_idx')
+        ]
 
 
 class GroupSession(models.Model):
@@ -87,6 +226,9 @@ class GroupSession(models.Model):
 
     class Meta:
         ordering = ['title']
+        indexes = [
+            models.Index(fields=['title'], name='groupsession_title_idx')
+        ]
 
 
 class Review(models.Model):
@@ -95,3 +237,128 @@ class Review(models.Model):
     description = models.TextField()
     date = models.DateField(auto_now_add=True)
     objects = models.Manager()
+
+    def save(self, *args, **kwargs):
+        # Keeps the TeacherReviewStats update from the save signal in the same transaction.
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(Review, instance=self)):
+            super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['teacher', 'date', 'id'], name='review_teacher_date_id_idx')
+        ]
+
+
+class TeacherReviewStats(models.Model):
+    teacher = models.OneToOneField(Teacher, on_delete=models.CASCADE, primary_key=True, related_name='review_stats')
+    review_count = models.PositiveIntegerField(default=0)
+    last_review_date = models.DateField(null=True, blank=True)
+    recent_review_count = models.PositiveIntegerField(default=0)
+    recent_as_of = models.DateField(null=True, blank=True)
+    objects = models.Manager()
+
+    def __str__(self):
+        return f'{self.teacher_id}: {self.review_count}'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['review_count'], name='teacher_review_count_idx'),
+            models.Index(fields=['last_review_date'], name='teacher_last_review_idx'),
+            models.Index(fields=['recent_review_count'], name='teacher_recent_review_idx'),
+            models.Index(fields=['recent_as_of'], name='teacher_review_as_of_idx')
+        ]
+
+    @staticmethod
+    def get_recent_start(today):
+        return today - settings.TEACHER_RECENT_REVIEW_WINDOW
+
+    @classmethod
+    def add_review(cls, review):
+        updated = cls.objects.filter(teacher_id=review.teacher_id).update(
+            review_count=F('review_count') + 1,
+            last_review_date=Case(
+                When(last_review_date__gte=review.date, then=F('last_review_date')),
+                default=Value(review.date)
+            ),
+            recent_review_count=F('recent_review_count') + 1
+        )
+        if not updated:
+            cls.rebuild([review.teacher_id])
+
+    @classmethod
+    def remove_review(cls, review):
+        # Never creates a row: the teacher itself may be in the middle of a cascading delete.
+        reviews = Review.objects.filter(teacher_id=OuterRef('teacher_id')).order_by().values('teacher_id')
+        cls.objects.filter(teacher_id=review.teacher_id).update(
+            review_count=F('review_count') - 1,
+            last_review_date=Subquery(reviews.annotate(last=Max('date')).values('last')),
+            recent_review_count=Case(
+                When(recent_as_of__lt=review.date + settings.TEACHER_RECENT_REVIEW_WINDOW,
+                     then=F('recent_review_count') - 1),
+                default=F('recent_review_count'),
+                output_field=models.PositiveIntegerField()
+            )
+        )
+
+    @classmethod
+    def refresh_recent(cls, today=None):
+        """Slide the rolling window of rows last computed before `today`."""
+        today = today or timezone.localdate()
+        recent = (
+            Review.objects.filter(teacher_id=OuterRef('teacher_id'), date__gt=cls.get_recent_start(today))
+            .order_by().values('teacher_id').annotate(count=Count('id')).values('count')
+        )
+        # A background write: it doesn't pin the request that happens to trigger it to the primary.
+        stale = cls.objects.db_manager(hints={'background': True}).filter(
+            Q(recent_as_of__lt=today) | Q(recent_as_of__isnull=True)
+        )
+        return stale.update(
+            recent_review_count=Coalesce(Subquery(recent), 0, output_field=models.PositiveIntegerField()),
+            recent_as_of=today
+        )
+
+    @classmethod
+    def refresh_recent_daily(cls, today=None, force=False):
+        """
+        `refresh_recent()` once a day across all workers, claimed with a
+        shared cache flag so concurrent first reads don't all run it. The
+        `refresh_review_stats` command runs it with `force` ahead of traffic.
+        """
+        today = today or timezone.localdate()
+        key = f'{RECENT_REFRESH_PREFIX}{today}'
+        if force:
+            cache.get_cache().set(key, True, timeout=2 * 24 * 60 * 60)
+        elif not cache.get_cache().add(key, True, timeout=2 * 24 * 60 * 60):
+            return 0
+        try:
+            updated = cls.refresh_recent(today)
+        except BaseException:
+            cache.get_cache().delete(key)
+            raise
+        if updated:
+            # Reads that skipped the refresh while it ran may have cached the old counts.
+            cache.invalidate(f'{Teacher._meta.label}:date={today}')
+        return updated
+
+    @classmethod
+    def rebuild(cls, teacher_ids):
+        teacher_ids = set(teacher_ids)
+        today = timezone.localdate()
+        reviews = Review.objects.filter(teacher_id=OuterRef('teacher_id')).order_by().values('teacher_id')
+        changes = {
+            'review_count': Coalesce(
+                Subquery(reviews.annotate(count=Count('id')).values('count')), 0,
+                output_field=models.PositiveIntegerField()
+            ),
+            'last_review_date': Subquery(reviews.annotate(last=Max('date')).values('last')),
+            'recent_review_count': Coalesce(Subquery(
+                reviews.filter(date__gt=cls.get_recent_start(today)).annotate(count=Count('id')).values('count')
+            ), 0, output_field=models.PositiveIntegerField()),
+            'recent_as_of': Value(today)
+        }
+        if cls.objects.filter(teacher_id__in=teacher_ids).update(**changes) < len(teacher_ids):
+            cls.objects.bulk_create(
+                [cls(teacher_id=pk) for pk in Teacher.objects.filter(pk__in=teacher_ids).values_list('id', flat=True)],
+                ignore_conflicts=True
+            )
+            cls.objects.filter(teacher_id__in=teacher_ids).update(**changes)
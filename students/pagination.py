@@ -1,5 +1,286 @@
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+import json
+from base64 import b64decode, b64encode
+from urllib import parse
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator, Page, PageNotAnInteger, EmptyPage
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, CursorPagination, Cursor
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from . import cache
+
+
+def estimate_table_rows(model, using):
+    """Row count from the database's table statistics, or None if it has none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [table]
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    return int(str(row[0]).split()[0])
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that avoids running `COUNT(*)` on every page.
+
+    Unfiltered querysets on tables whose statistics report at least
+    `estimate_threshold` rows use that estimate; other querysets are counted
+    exactly. Either result is cached for `count_timeout` seconds under the
+    query's SQL and the model's cache version, so a write to the model
+    starts a fresh count.
+
+    An estimate can be off either way, so pages of estimated querysets
+    fetch one row past their end to tell whether another page follows,
+    and page numbers past the estimated end are still served.
+    """
+    count_timeout = 60
+    estimate_threshold = 100000
+    count_is_exact = True
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        sql, params = queryset.query.sql_with_params()
+        version, = cache.get_versions([queryset.model._meta.label])
+        digest = hashlib.sha1(f'{queryset.db}|{sql}|{params!r}|{version}'.encode('utf-8')).hexdigest()
+        key = f'students:count:{digest}'
+
+        cached = cache.get_cache().get(key)
+        if cached is None:
+            cached = self.get_count(queryset)
+            cache.get_cache().set(key, cached, self.count_timeout)
+        count, self.count_is_exact = cached
+        return count
+
+    def get_count(self, queryset):
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate, False
+        return queryset.count(), True
+
+    def validate_number(self, number):
+        if self.count == 0 or self.count_is_exact:
+            return super().validate_number(number)
+        # An estimate may undercount, so pages past its end are still served.
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return LookaheadPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+
+class LookaheadPage(Page):
+    """A page that knows whether another follows from the rows themselves rather than from the count."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
 
 
 class DefaultPagination(PageNumberPagination):
     page_size = 10
+    django_paginator_class = CachedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_exact': self.page.paginator.count_is_exact,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a composite ordering.
+
+    The cursor stores the full ordering tuple of the boundary row and the
+    primary key is always appended as a tie-breaker, so every position is
+    unique and pages are fetched with a keyset predicate instead of an
+    OFFSET. Ordering fields must be non-nullable.
+    """
+    page_size = 10
+    ordering = ('id',)
+    tie_breaker = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not any(field.lstrip('-') in (self.tie_breaker, 'pk') for field in ordering):
+            ordering += (self.tie_breaker,)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([instance async for instance in queryset.aiterator()])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """The queryset of the requested page plus one row to detect the next page, or None if disabled."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.ordering_fields = [self.get_ordering_field(queryset, field.lstrip('-')) for field in self.ordering]
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self.reverse, self.current_position = False, None
+        else:
+            self.reverse, self.current_position = self.cursor.reverse, self.cursor.position
+
+        ordering = _reverse_ordering(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.current_position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(ordering, self.current_position))
+        return queryset[:self.page_size + 1]
+
+    def get_ordering_field(self, queryset, name):
+        """The model field or annotation output field that `name` orders by."""
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        if name == 'pk':
+            return queryset.model._meta.pk
+        return queryset.model._meta.get_field(name)
+
+    def set_page(self, results):
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+
+        if self.reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = self.current_position is not None
+            self.has_previous = has_following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = self.current_position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_keyset_filter(self, ordering, position):
+        """
+        Build `(a, b, c) > (x, y, z)` as an OR of prefix-equality terms.
+
+        The leading `a >= x` bound is redundant but lets the database turn the
+        predicate into a range scan on the composite index.
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        first = ordering[0]
+        bound = {f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]}
+        return Q(**bound) & condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering) if self.page \
+            else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering) if self.page \
+            else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+            position = tokens.get('p', [None])[0]
+            if position is not None:
+                position = json.loads(position)
+                if not isinstance(position, list) or len(position) != len(self.ordering):
+                    raise ValueError
+                position = [field.to_python(value) for field, value in zip(self.ordering_fields, position)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {}
+        if cursor.reverse:
+            tokens['r'] = '1'
+        if cursor.position is not None:
+            tokens['p'] = json.dumps(cursor.position, separators=(',', ':'))
+
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for field in ordering:
+            name = field.lstrip('-')
+            attr = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            position.append(str(attr))
+        return position
+
+
+class StudentCursorPagination(KeysetPagination):
+    ordering = ('course', 'last_name', 'id')
+
+
+class ReviewCursorPagination(KeysetPagination):
+    ordering = ('-date', '-id')
+
+
+def _reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith('-') else '-' + field for field in ordering)
@@ -0,0 +1,17 @@
+from hmac import compare_digest
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+
+class HasMetricsToken(BasePermission):
+    """
+    Allows a scraper presenting `Authorization: Bearer <METRICS_TOKEN>`, so
+    Prometheus needs no user account; staff users are always allowed.
+    """
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        return bool(token) and scheme.lower() == 'bearer' and compare_digest(credentials, token)
@@ -0,0 +1,149 @@
+import re
+from django.db import connections
+from rest_framework.filters import SearchFilter
+
+SEARCH_INDEXES = {
+    'students.Curator': ['name'],
+    'students.Teacher': ['first_name', 'last_name', 'about_me'],
+    'students.GroupSession': ['title', 'description'],
+    'students.Review': ['name', 'description'],
+}
+
+
+def get_index_fields(model):
+    return SEARCH_INDEXES.get(model._meta.label)
+
+
+def get_index_name(table):
+    return f'{table}_fts'
+
+
+# InnoDB's default stopword list, INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD.
+INNODB_STOPWORDS = frozenset([
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from', 'how', 'i', 'in', 'is',
+    'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what', 'when', 'where', 'who', 'will',
+    'with', 'und', 'www',
+])
+
+
+class MySQLFullTextBackend:
+    """
+    InnoDB FULLTEXT indexes are maintained by MySQL itself, so writes are
+    no-ops. They only hold committed rows, and leave out words shorter than
+    `innodb_ft_min_token_size` and stopwords, so searches for those can't
+    use the index.
+    """
+
+    def __init__(self):
+        self.min_token_sizes = {}
+
+    def can_search(self, using, words):
+        min_token_size = self.get_min_token_size(using)
+        return all(len(word) >= min_token_size and word.lower() not in INNODB_STOPWORDS for word in words)
+
+    def get_min_token_size(self, using):
+        if using not in self.min_token_sizes:
+            with connections[using].cursor() as cursor:
+                cursor.execute('SELECT @@innodb_ft_min_token_size')
+                self.min_token_sizes[using] = cursor.fetchone()[0]
+        return self.min_token_sizes[using]
+
+    def update(self, instance, fields):
+        pass
+
+    def rebuild(self, model, fields, using):
+        pass
+
+    def delete(self, instance):
+        pass
+
+    def search(self, queryset, fields, words):
+        quote = connections[queryset.db].ops.quote_name
+        table = queryset.model._meta.db_table
+        columns = ', '.join(f'{quote(table)}.{quote(field)}' for field in fields)
+        match = f'MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)'
+        query = ' '.join(f'+{word}*' for word in words)
+        return queryset.extra(
+            select={'search_rank': match},
+            select_params=[query],
+            where=[match],
+            params=[query],
+            order_by=['-search_rank']
+        )
+
+
+class SQLiteFTS5Backend:
+    """Mirrors the indexed columns into an FTS5 table keyed by the row's pk."""
+
+    def can_search(self, using, words):
+        return True
+
+    def update(self, instance, fields):
+        connection = connections[instance._state.db]
+        quote = connection.ops.quote_name
+        index = quote(get_index_name(instance._meta.db_table))
+        columns = ', '.join(quote(field) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {index} WHERE rowid = %s', [instance.pk])
+            cursor.execute(
+                f'INSERT INTO {index} (rowid, {columns}) VALUES (%s, {", ".join(["%s"] * len(fields))})',
+                [instance.pk, *(getattr(instance, field) for field in fields)]
+            )
+
+    def rebuild(self, model, fields, using):
+        """Re-mirror every row, for writes that bypassed the save signals such as `bulk_create`."""
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        table = model._meta.db_table
+        index = quote(get_index_name(table))
+        columns = ', '.join(quote(field) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {index}')
+            cursor.execute(f'INSERT INTO {index} (rowid, {columns}) SELECT id, {columns} FROM {quote(table)}')
+
+    def delete(self, instance):
+        connection = connections[instance._state.db]
+        index = connection.ops.quote_name(get_index_name(instance._meta.db_table))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {index} WHERE rowid = %s', [instance.pk])
+
+    def search(self, queryset, fields, words):
+        quote = connections[queryset.db].ops.quote_name
+        table = quote(queryset.model._meta.db_table)
+        index = quote(get_index_name(queryset.model._meta.db_table))
+        query = ' '.join(f'"{word}"*' for word in words)
+        return queryset.extra(
+            select={'search_rank': f'{index}.rank'},
+            tables=[get_index_name(queryset.model._meta.db_table)],
+            where=[f'{index}.rowid = {table}.{quote("id")}', f'{index} MATCH %s'],
+            params=[query],
+            order_by=['search_rank']
+        )
+
+
+SEARCH_BACKENDS = {
+    'mysql': MySQLFullTextBackend(),
+    'sqlite': SQLiteFTS5Backend(),
+}
+
+
+def get_backend(alias):
+    return SEARCH_BACKENDS.get(connections[alias].vendor)
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    `?search=` backed by the database's full-text index, ordered by relevance.
+
+    Every word must match as a prefix in one of the indexed fields. Models
+    without an index, databases without a backend, and words the index
+    leaves out fall back to `SearchFilter`'s `icontains` lookups.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        words = re.findall(r'\w+', ' '.join(self.get_search_terms(request)))
+        fields = get_index_fields(queryset.model)
+        backend = get_backend(queryset.db)
+        if not words or fields is None or backend is None or not backend.can_search(queryset.db, words):
+            return super().filter_queryset(request, queryset, view)
+        return backend.search(queryset, fields, words)
@@ -1,5 +1,7 @@
+from urllib.parse import quote
+from django.db import connection
 from rest_framework import serializers
-from .models import Student, Curator, Teacher, GroupSession, Review
+from .models import Student, Curator, CuratorWorkload, Teacher, GroupSession, Review
 
 
 class CuratorSerializer(serializers.ModelSerializer):
@@ -8,21 +10,190 @@ class CuratorSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'phone']
 
 
+class CuratorWorkloadSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source='curator.name', read_only=True)
+    upcoming_exams = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CuratorWorkload
+        fields = ['curator', 'name', 'student_count', 'basic_count', 'standard_count', 'vip_count',
+                  'general_count', 'academic_count', 'upcoming_exams']
+
+    def get_upcoming_exams(self, workload):
+        return self.context.get('upcoming_exams', {}).get(workload.curator_id, 0)
+
+
+class TemplatedHyperlinkedRelatedField(serializers.HyperlinkedRelatedField):
+    """
+    Reverses the detail URL once per request and fills in each lookup value,
+    instead of running `reverse()` and `build_absolute_uri()` for every row.
+    """
+    placeholder = '__lookup__'
+
+    def get_url(self, obj, view_name, request, format):
+        if format or (hasattr(obj, 'pk') and obj.pk in (None, '')):
+            return super().get_url(obj, view_name, request, format)
+        prefix, suffix = self.get_url_template(view_name, request)
+        return prefix + quote(str(getattr(obj, self.lookup_field)), safe='') + suffix
+
+    def get_url_template(self, view_name, request):
+        cached = getattr(self, '_url_template', None)
+        if cached is None or cached[0] is not request or cached[1] != view_name:
+            url = self.reverse(view_name, kwargs={self.lookup_url_kwarg: self.placeholder}, request=request)
+            cached = (request, view_name, *url.split(self.placeholder, 1))
+            self._url_template = cached
+        return cached[2:]
+
+
 class StudentSerializer(serializers.ModelSerializer):
-    curator = serializers.HyperlinkedRelatedField(
+    curator = TemplatedHyperlinkedRelatedField(
+        queryset=Curator.objects.all(),
+        view_name='curators-detail'
+    )
+    status = serializers.ChoiceField(Student.STATUS_CHOICES, source='get_status', read_only=True)
+
+    class Meta:
+        model = Student
+        fields = ['id', 'course', 'curator', 'first_name', 'last_name', 'status']
+
+
+class DeferredHyperlinkedRelatedField(TemplatedHyperlinkedRelatedField):
+    """Resolves a hyperlink to its lookup value without fetching the object."""
+
+    def get_object(self, view_name, view_args, view_kwargs):
+        return view_kwargs[self.lookup_url_kwarg]
+
+
+class StudentBulkListSerializer(serializers.ListSerializer):
+    batch_size = 500
+    unique_fields = ['phone', 'email']
+
+    def to_internal_value(self, data):
+        rows = super().to_internal_value(data)
+        errors = [{} for _ in rows]
+
+        if self.partial:
+            self.validate_instances(rows, errors)
+        else:
+            for row in rows:
+                row.pop('id', None)
+        self.validate_curators(rows, errors)
+        for field in self.unique_fields:
+            self.validate_unique(field, rows, errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return rows
+
+    def validate_instances(self, rows, errors):
+        self.instances = self.instance.in_bulk([row['id'] for row in rows if 'id' in row])
+        for index, row in enumerate(rows):
+            if 'id' not in row:
+                errors[index]['id'] = ['This field is required.']
+            elif row['id'] not in self.instances:
+                errors[index]['id'] = [f'Invalid pk "{row["id"]}" - object does not exist.']
+
+    def validate_curators(self, rows, errors):
+        curator_ids = {}
+        for index, row in enumerate(rows):
+            if 'curator' in row:
+                try:
+                    curator_ids[index] = int(row['curator'])
+                except ValueError:
+                    curator_ids[index] = None
+        curators = Curator.objects.in_bulk({pk for pk in curator_ids.values() if pk is not None})
+        message = self.child.fields['curator'].error_messages['does_not_exist']
+        for index, pk in curator_ids.items():
+            if pk in curators:
+                rows[index]['curator'] = curators[pk]
+            else:
+                errors[index]['curator'] = [message]
+
+    def validate_unique(self, field, rows, errors):
+        default = Student._meta.get_field(field).get_default()
+        owners = dict(
+            Student.objects
+            .filter(**{f'{field}__in': [row.get(field, default) for row in rows]})
+            .values_list(field, 'id')
+        )
+        seen = set()
+        for index, row in enumerate(rows):
+            if field in row:
+                value = row[field]
+            elif not self.partial:
+                value = default
+            else:
+                continue
+            if value in seen or owners.get(value, row.get('id')) != row.get('id'):
+                errors[index].setdefault(field, []).append(f'student with this {field} already exists.')
+            seen.add(value)
+
+    def create(self, validated_data):
+        students = Student.objects.bulk_create(
+            [Student(**attrs) for attrs in validated_data],
+            batch_size=self.batch_size
+        )
+        if not connection.features.can_return_rows_from_bulk_insert:
+            created = Student.objects.in_bulk([student.phone for student in students], field_name='phone')
+            students = [created[student.phone] for student in students]
+        CuratorWorkload.rebuild({student.curator_id for student in students})
+        return students
+
+    def update(self, instance, validated_data):
+        students = []
+        fields = set()
+        curator_ids = set()
+        for attrs in validated_data:
+            student = self.instances[attrs.pop('id')]
+            curator_ids.add(student.curator_id)
+            for attr, value in attrs.items():
+                setattr(student, attr, value)
+            fields.update(attrs)
+            students.append(student)
+        if fields:
+            Student.objects.bulk_update(students, fields, batch_size=self.batch_size)
+        if fields & {'curator', 'package', 'ielts_module'}:
+            CuratorWorkload.rebuild(curator_ids | {student.curator_id for student in students})
+            for student in students:
+                student._workload_key = student.get_workload_key()
+        return students
+
+
+class StudentBulkSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+    curator = DeferredHyperlinkedRelatedField(
         queryset=Curator.objects.all(),
         view_name='curators-detail'
     )
 
     class Meta:
         model = Student
-        fields = ['id', 'course', 'curator', 'first_name', 'last_name']
+        list_serializer_class = StudentBulkListSerializer
+        fields = [
+            'id', 'course', 'curator', 'first_name', 'last_name', 'phone', 'email', 'skype_name',
+            'ielts_module', 'goal_score', 'exam_date', 'package'
+        ]
+        extra_kwargs = {
+            'phone': {'validators': []},
+            'email': {'validators': []}
+        }
 
 
 class TeacherSerializer(serializers.ModelSerializer):
+    review_count = serializers.IntegerField(source='review_stats.review_count', read_only=True)
+    last_review_date = serializers.DateField(source='review_stats.last_review_date', read_only=True)
+    recent_review_count = serializers.IntegerField(source='review_stats.recent_review_count', read_only=True)
+
+    class Meta:
+        model = Teacher
+        fields = ['id', 'first_name', 'last_name', 'phone', 'email', 'skype_name', 'about_me', 'groupsessions',
+                  'review_count', 'last_review_date', 'recent_review_count']
+
+
+class TeacherSummarySerializer(serializers.ModelSerializer):
     class Meta:
         model = Teacher
-        fields = ['id', 'first_name', 'last_name', 'phone', 'email', 'skype_name', 'about_me', 'groupsessions']
+        fields = ['id', 'first_name', 'last_name']
 
 
 class GroupSessionSerializer(serializers.ModelSerializer):
@@ -31,6 +202,12 @@ class GroupSessionSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'teacher']
 
 
+class GroupSessionSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GroupSession
+        fields = ['id', 'title', 'description']
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
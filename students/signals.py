@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from . import authentication, cache, metrics, search
+from .models import Curator, Student, Teacher, GroupSession, Review, CuratorWorkload, TeacherReviewStats
+
+CACHED_MODELS = (Curator, Student, Teacher, GroupSession, Review)
+
+
+def get_cache_scopes(sender, instance):
+    scopes = [sender._meta.label]
+    if sender is Review:
+        # Teachers carry their review aggregates.
+        scopes += [f'{sender._meta.label}:teacher={instance.teacher_id}', Teacher._meta.label]
+    return scopes
+
+
+@receiver(post_save)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    fields = search.get_index_fields(sender)
+    backend = fields and search.get_backend(instance._state.db)
+    if backend and not raw:
+        backend.update(instance, fields)
+
+
+@receiver(post_delete)
+def delete_search_index(sender, instance, **kwargs):
+    backend = search.get_index_fields(sender) and search.get_backend(instance._state.db)
+    if backend:
+        backend.delete(instance)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_response_cache(sender, instance, using=None, **kwargs):
+    if sender not in CACHED_MODELS:
+        return
+    scopes = get_cache_scopes(sender, instance)
+    if kwargs['signal'] is post_delete:
+        # Deleting a row drops its M2M rows without sending m2m_changed.
+        scopes += [field.related_model._meta.label for field in sender._meta.get_fields() if field.many_to_many]
+    cache.invalidate(*scopes, using=using)
+
+
+@receiver(m2m_changed, sender=GroupSession.teacher.through)
+def invalidate_group_session_teachers(sender, action, using=None, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        cache.invalidate(GroupSession._meta.label, Teacher._meta.label, using=using)
+
+
+@receiver(post_save, sender=Curator)
+def create_curator_workload(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CuratorWorkload.objects.get_or_create(curator=instance)
+
+
+@receiver(pre_save, sender=Student)
+@receiver(pre_delete, sender=Student)
+def load_student_workload_key(sender, instance, **kwargs):
+    if instance.pk is not None and not hasattr(instance, '_workload_key'):
+        instance._workload_key = (
+            Student.objects.filter(pk=instance.pk)
+            .values_list('curator_id', 'package', 'ielts_module')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Student)
+def update_curator_workload(sender, instance, **kwargs):
+    old, new = getattr(instance, '_workload_key', None), instance.get_workload_key()
+    if old != new:
+        if old is not None:
+            CuratorWorkload.apply(old, -1)
+        CuratorWorkload.apply(new, 1)
+    instance._workload_key = new
+
+
+@receiver(post_delete, sender=Student)
+def release_curator_workload(sender, instance, **kwargs):
+    CuratorWorkload.apply(instance._workload_key, -1)
+
+
+@receiver(post_save, sender=Teacher)
+def create_teacher_review_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        TeacherReviewStats.objects.get_or_create(teacher=instance, defaults={'recent_as_of': timezone.localdate()})
+
+
+@receiver(post_save, sender=Review)
+def add_teacher_review(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        TeacherReviewStats.add_review(instance)
+
+
+@receiver(post_delete, sender=Review)
+def remove_teacher_review(sender, instance, **kwargs):
+    TeacherReviewStats.remove_review(instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, using=None, **kwargs):
+    authentication.invalidate_user(instance.pk, using=using)
+
+
+@receiver(connection_created)
+def install_query_metrics(sender, connection, **kwargs):
+    # Fires again on every reconnect of the same wrapper.
+    if getattr(settings, 'METRICS_SAMPLE_RATE', 1.0) > 0 and metrics.record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.record_query)
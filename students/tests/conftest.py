@@ -1,6 +1,8 @@
 from rest_framework.test import APIClient
 from django.contrib.auth.models import User
+from django.core.cache import cache
 import pytest
+from students import authentication
 
 
 @pytest.fixture
@@ -20,3 +22,12 @@ def create_new_instance(api_client):
     def do_create_new_instance(endpoint, instance):
         return api_client.post(endpoint, instance)
     return do_create_new_instance
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    authentication.reset_users()
+    yield
+    cache.clear()
+    authentication.reset_users()
@@ -0,0 +1,113 @@
+from asgiref.sync import async_to_sync
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth.models import User
+from django.test import AsyncClient
+import pytest
+from model_bakery import baker
+from students.models import Curator, Student, Teacher, GroupSession, Review
+
+
+@pytest.fixture
+def async_get():
+    def do_async_get(path, user=None):
+        headers = {}
+        if user is not None:
+            headers['Authorization'] = f'JWT {AccessToken.for_user(user)}'
+
+        async def get():
+            return await AsyncClient().get(path, headers=headers)
+        return async_to_sync(get)()
+    return do_async_get
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user('user', 'user@mail.ru', 'password')
+
+
+@pytest.mark.django_db
+class TestAsyncReadPath:
+    def test_if_user_is_anonymous_returns_401(self, async_get):
+        response = async_get('/ielts/async/curators/')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response['WWW-Authenticate'].startswith('JWT')
+
+    @pytest.mark.parametrize('path', ['curators', 'teachers', 'group_sessions'])
+    def test_if_list_is_requested_returns_same_data_as_sync_path(self, async_get, user, api_client, path):
+        teacher = baker.make(Teacher)
+        baker.make(GroupSession, teacher=[teacher])
+        baker.make(Curator)
+
+        response = async_get(f'/ielts/async/{path}/', user)
+        api_client.force_authenticate(user=user)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == api_client.get(f'/ielts/{path}/').json()
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('query, names', [
+        ('search=olga', ['Olga']),
+        ('ordering=-first_name', ['Olga', 'Maria', 'Anna']),
+        ('groupsessions={group_session}', ['Anna']),
+    ])
+    def test_if_teachers_are_filtered_returns_same_data_as_sync_path(self, async_get, user, api_client, query, names):
+        group_session = baker.make(GroupSession)
+        teachers = [
+            baker.make(Teacher, first_name=name, email=f'{name}@mail.ru', phone=f'+7{i}')
+            for i, name in enumerate(['Olga', 'Anna', 'Maria'])
+        ]
+        group_session.teacher.add(teachers[1])
+        path = f'/ielts/teachers/?{query.format(group_session=group_session.pk)}'
+
+        response = async_get(path.replace('/ielts/', '/ielts/async/'), user)
+        api_client.force_authenticate(user=user)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['first_name'] for row in response.json()] == names
+        assert response.json() == api_client.get(path).json()
+
+    def test_if_fields_are_requested_returns_400(self, async_get, user):
+        response = async_get('/ielts/async/curators/?fields=id', user)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {'fields': ['Not supported on the async routes.']}
+
+    def test_if_students_are_listed_returns_cursor_pages(self, async_get, user):
+        curator = baker.make(Curator)
+        for i in range(15):
+            baker.make(Student, curator=curator, course=21, email=f'{i}@mail.ru')
+
+        first = async_get('/ielts/async/students/', user).json()
+        second = async_get(first['next'], user).json()
+
+        assert len(first['results']) == 10
+        assert len(second['results']) == 5
+        assert second['next'] is None
+
+    def test_if_student_exists_returns_200(self, async_get, user):
+        student = baker.make(Student)
+
+        response = async_get(f'/ielts/async/students/{student.pk}/', user)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['id'] == student.pk
+
+    def test_if_student_does_not_exist_returns_404(self, async_get, user):
+        response = async_get('/ielts/async/students/0/', user)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_if_reviews_are_listed_returns_teacher_reviews(self, async_get, user):
+        teacher = baker.make(Teacher)
+        review = baker.make(Review, teacher=teacher)
+
+        response = async_get(f'/ielts/async/teachers/{teacher.pk}/reviews/', user)
+
+        assert [row['id'] for row in response.json()['results']] == [review.pk]
+
+    def test_if_teacher_does_not_exist_returns_404(self, async_get, user):
+        response = async_get('/ielts/async/teachers/0/reviews/', user)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,71 @@
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth.models import User
+import pytest
+from students import authentication
+
+
+@pytest.fixture
+def token_client(api_client):
+    def do_token_client(user):
+        api_client.credentials(HTTP_AUTHORIZATION=f'JWT {AccessToken.for_user(user)}')
+        return api_client
+    authentication.stats.reset()
+    return do_token_client
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    def test_if_token_is_reused_loads_user_once(self, token_client, django_assert_num_queries):
+        user = User.objects.create_user('user', 'user@mail.ru', 'password')
+        client = token_client(user)
+
+        client.get('/ielts/curators/')
+        with django_assert_num_queries(1):
+            response = client.get('/ielts/curators/?page=2')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert authentication.stats.as_dict() == {'hits': 1, 'misses': 1}
+
+    def test_if_user_is_deactivated_returns_401(self, token_client):
+        user = User.objects.create_user('user', 'user@mail.ru', 'password')
+        client = token_client(user)
+
+        client.get('/ielts/curators/')
+        user.is_active = False
+        user.save()
+        response = client.get('/ielts/curators/')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_user_loses_staff_flag_returns_403(self, token_client):
+        user = User.objects.create_user('admin', 'admin@mail.ru', 'password', is_staff=True)
+        client = token_client(user)
+
+        client.post('/ielts/curators/', {})
+        user.is_staff = False
+        user.save()
+        response = client.post('/ielts/curators/', {})
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestUserCache:
+    def test_if_cache_is_full_evicts_least_recently_used_user(self, settings):
+        settings.AUTH_USER_CACHE_SIZE = 2
+        users = [User(pk=pk, username=f'user{pk}') for pk in range(3)]
+
+        authentication.cache_user(0, users[0])
+        authentication.cache_user(1, users[1])
+        authentication.get_cached_user(0)
+        authentication.cache_user(2, users[2])
+
+        assert authentication.get_cached_user(1) is None
+        assert authentication.get_cached_user('0').username == 'user0'
+
+    def test_if_entry_has_expired_returns_none(self, settings):
+        settings.AUTH_USER_CACHE_TIMEOUT = 0
+
+        authentication.cache_user(1, User(pk=1))
+
+        assert authentication.get_cached_user(1) is None
@@ -1,7 +1,9 @@
 from rest_framework import status
+from django.contrib.auth.models import User
 import pytest
 from model_bakery import baker
-from students.models import Curator, Student
+from students import search
+from students.models import Curator, CuratorWorkload, Student
 
 
 @pytest.mark.django_db
@@ -209,3 +211,238 @@ class TestDeleteRelatedToStudentCurator:
         response = api_client.delete(f'/ielts/curators/{curator.pk}/')
 
         assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_if_workload_rollup_drifted_returns_405(self, api_client, authenticate_user):
+        student = baker.make(Student)
+        curator = student.curator
+        CuratorWorkload.objects.filter(curator=curator).update(student_count=0)
+
+        authenticate_user(is_staff=True)
+        response = api_client.delete(f'/ielts/curators/{curator.pk}/')
+
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+        assert Curator.objects.filter(pk=curator.pk).exists()
+
+
+@pytest.mark.django_db
+class TestStreamCuratorList:
+    def test_if_format_is_ndjson_returns_one_curator_per_line(self, api_client, authenticate_user):
+        curators = baker.make(Curator, _quantity=3)
+
+        authenticate_user()
+        response = api_client.get('/ielts/curators/?format=ndjson')
+
+        assert response.status_code == status.HTTP_200_OK
+        lines = b''.join(response.streaming_content).splitlines()
+        assert len(lines) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSearchCurators:
+    def test_if_name_matches_returns_curator(self, api_client, authenticate_user):
+        curator = baker.make(Curator, name='Svetlana')
+        baker.make(Curator, name='Irina')
+
+        authenticate_user()
+        response = api_client.get('/ielts/curators/?search=svet')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['id'] for row in response.data] == [curator.pk]
+
+    @pytest.mark.parametrize('term', ['li', 'the'])
+    def test_if_full_text_index_leaves_term_out_matches_with_icontains(
+            self, api_client, authenticate_user, monkeypatch, term):
+        backend = search.MySQLFullTextBackend()
+        monkeypatch.setattr(backend, 'get_min_token_size', lambda using: 3)
+        monkeypatch.setattr(search, 'get_backend', lambda alias: backend)
+        curator = baker.make(Curator, name='Li Theodora')
+        baker.make(Curator, name='Irina')
+
+        authenticate_user()
+        response = api_client.get(f'/ielts/curators/?search={term}')
+
+        assert [row['id'] for row in response.data] == [curator.pk]
+
+
+@pytest.mark.django_db
+class TestCacheCurators:
+    def test_if_list_is_requested_twice_returns_cached_response(
+            self, api_client, authenticate_user, django_assert_num_queries):
+        baker.make(Curator, _quantity=3)
+
+        authenticate_user()
+        first = api_client.get('/ielts/curators/')
+        with django_assert_num_queries(0):
+            second = api_client.get('/ielts/curators/')
+
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert second.content == first.content
+
+    def test_if_curator_is_saved_returns_fresh_response(self, api_client, authenticate_user):
+        curator = baker.make(Curator, name='Anna')
+
+        authenticate_user()
+        api_client.get(f'/ielts/curators/{curator.pk}/')
+        curator.name = 'Maria'
+        curator.save()
+        response = api_client.get(f'/ielts/curators/{curator.pk}/')
+
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['name'] == 'Maria'
+
+    def test_if_query_string_differs_returns_separate_entries(self, api_client, authenticate_user):
+        baker.make(Curator, name='Anna')
+
+        authenticate_user()
+        api_client.get('/ielts/curators/')
+        response = api_client.get('/ielts/curators/?search=anna')
+
+        assert response['X-Cache'] == 'MISS'
+
+    def test_if_host_differs_returns_separate_entries(self, api_client, authenticate_user, settings):
+        settings.ALLOWED_HOSTS = ['a.example.com', 'b.example.com']
+        baker.make(Curator)
+
+        authenticate_user()
+        api_client.get('/ielts/curators/', HTTP_HOST='a.example.com')
+        response = api_client.get('/ielts/curators/', HTTP_HOST='b.example.com')
+
+        assert response['X-Cache'] == 'MISS'
+
+
+@pytest.mark.django_db
+class TestCuratorAdminStudentInline:
+    def get_change_view(self, client, curator, query=''):
+        admin = User.objects.create_superuser('admin', 'admin@mail.ru', 'password')
+        client.force_login(admin)
+        return client.get(f'/admin/students/curator/{curator.pk}/change/{query}')
+
+    def test_if_curator_has_many_students_renders_first_page_only(self, client):
+        curator = baker.make(Curator)
+        for i in range(45):
+            baker.make(Student, curator=curator, email=f'{i}@mail.ru')
+
+        response = self.get_change_view(client, curator)
+
+        assert response.status_code == status.HTTP_200_OK
+        formset = response.context['inline_admin_formsets'][0].formset
+        assert len(formset.forms) == 20
+        assert formset.next_url() == '?student_set-page=2'
+        assert formset.previous_url() is None
+
+    def test_if_last_page_is_requested_renders_remaining_students(self, client):
+        curator = baker.make(Curator)
+        for i in range(45):
+            baker.make(Student, curator=curator, email=f'{i}@mail.ru')
+
+        response = self.get_change_view(client, curator, '?student_set-page=3')
+
+        formset = response.context['inline_admin_formsets'][0].formset
+        assert len(formset.forms) == 5
+        assert formset.next_url() is None
+        assert b'student_set-page=2' in response.content
+
+    def test_if_students_tie_on_ordering_renders_each_on_one_page(self, client):
+        curator = baker.make(Curator)
+        for i in range(45):
+            baker.make(Student, curator=curator, course=20, last_name='Smith', email=f'{i}@mail.ru')
+
+        responses = [self.get_change_view(client, curator)] + [
+            client.get(f'/admin/students/curator/{curator.pk}/change/?student_set-page={page}') for page in (2, 3)
+        ]
+
+        seen = [
+            form.instance.pk
+            for response in responses
+            for form in response.context['inline_admin_formsets'][0].formset.forms
+        ]
+
+        assert sorted(seen) == list(Student.objects.order_by('pk').values_list('pk', flat=True))
+
+
+@pytest.mark.django_db
+class TestCuratorWorkload:
+    def test_if_students_are_saved_and_deleted_returns_current_counts(self):
+        curator, other = baker.make(Curator, _quantity=2)
+        vip = baker.make(Student, curator=curator, package=Student.PACKAGE_VIP, ielts_module=Student.MODULE_ACADEMIC,
+                         email='1@mail.ru')
+        basic = baker.make(Student, curator=curator, package=Student.PACKAGE_BASIC, email='2@mail.ru')
+
+        vip.package = Student.PACKAGE_STANDARD
+        vip.save()
+        Student.objects.only('id', 'email').get(pk=basic.pk).delete()
+        moved = Student.objects.defer('package').get(pk=vip.pk)
+        moved.curator = other
+        moved.save()
+
+        workload = CuratorWorkload.objects.get(curator=curator)
+        assert workload.student_count == 0 and workload.basic_count == 0
+        workload = CuratorWorkload.objects.get(curator=other)
+        assert (workload.student_count, workload.standard_count, workload.vip_count, workload.academic_count) == \
+            (1, 1, 0, 1)
+
+    def test_if_students_are_created_in_bulk_returns_rebuilt_counts(self, api_client, authenticate_user):
+        curator = baker.make(Curator)
+        authenticate_user(is_staff=True)
+
+        api_client.post('/ielts/students/bulk/', [
+            {'curator': f'http://testserver/ielts/curators/{curator.pk}/', 'first_name': 'a', 'last_name': 'b',
+             'phone': f'+7{i}', 'email': f'{i}@mail.ru', 'package': Student.PACKAGE_VIP, 'course': 21}
+            for i in range(3)
+        ], format='json')
+
+        workload = CuratorWorkload.objects.get(curator=curator)
+        assert (workload.student_count, workload.vip_count) == (3, 3)
+
+
+@pytest.mark.django_db
+class TestRetrieveCuratorStats:
+    def test_if_user_is_anonymous_returns_401(self, api_client):
+        curator = baker.make(Curator)
+
+        response = api_client.get(f'/ielts/curators/{curator.pk}/stats/')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_curator_exists_returns_200(self, api_client, authenticate_user):
+        curator = baker.make(Curator)
+        baker.make(Student, curator=curator, package=Student.PACKAGE_BASIC, email='1@mail.ru')
+
+        authenticate_user()
+        response = api_client.get(f'/ielts/curators/{curator.pk}/stats/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['student_count'] == 1
+        assert response.data['basic_count'] == 1
+        assert response.data['upcoming_exams'] == 0
+
+    def test_if_curator_does_not_exist_returns_404(self, api_client, authenticate_user):
+        authenticate_user()
+        response = api_client.get('/ielts/curators/0/stats/')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_if_dashboard_is_requested_returns_busiest_curators_first(self, api_client, authenticate_user):
+        quiet, busy = baker.make(Curator, _quantity=2)
+        for i in range(2):
+            baker.make(Student, curator=busy, email=f'{i}@mail.ru')
+
+        authenticate_user()
+        response = api_client.get('/ielts/curators/dashboard/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['curator'] for row in response.data] == [busy.pk, quiet.pk]
+        assert response.data[0]['student_count'] == 2
+
+
+@pytest.mark.django_db
+class TestDeleteCuratorAfterStudentsLeave:
+    def test_if_students_were_deleted_returns_204(self, api_client, authenticate_user):
+        curator = baker.make(Curator)
+        baker.make(Student, curator=curator).delete()
+
+        authenticate_user(is_staff=True)
+        response = api_client.delete(f'/ielts/curators/{curator.pk}/')
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
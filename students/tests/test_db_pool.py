@@ -0,0 +1,95 @@
+from rest_framework import status
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler, load_backend
+import pytest
+from students.db import pool
+
+
+@pytest.fixture
+def pooled_connection(tmp_path, django_db_blocker):
+    def do_pooled_connection(alias='pooled', **options):
+        settings_dict = ConnectionHandler({'default': {
+            'ENGINE': 'students.db.backends.sqlite3',
+            'NAME': str(tmp_path / 'pool.sqlite3'),
+            'CONN_MAX_AGE': 0,
+            'POOL': options,
+        }}).settings['default']
+        return load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, alias)
+    with django_db_blocker.unblock():
+        yield do_pooled_connection
+    for key in [key for key in pool._pools if key[1] == 'pooled']:
+        pool._pools.pop(key).close_idle()
+
+
+class TestConnectionPool:
+    def test_if_connection_is_closed_reuses_it(self, pooled_connection):
+        connection = pooled_connection(MAX_SIZE=2)
+
+        connection.ensure_connection()
+        raw = connection.connection
+        connection.close()
+        connection.ensure_connection()
+
+        assert connection.connection is raw
+        assert pool.get_stats()['pooled'] == {
+            'checkouts': 2, 'waits': 0, 'timeouts': 0, 'connects': 1, 'reconnects': 0,
+            'size': 1, 'idle': 0, 'max_size': 2
+        }
+        connection.close()
+
+    def test_if_pool_is_exhausted_times_out(self, pooled_connection):
+        first = pooled_connection(MAX_SIZE=1, TIMEOUT=0.05)
+        second = pooled_connection(MAX_SIZE=1, TIMEOUT=0.05)
+
+        first.ensure_connection()
+        with pytest.raises(OperationalError):
+            second.ensure_connection()
+
+        assert pool.get_stats()['pooled']['waits'] == 1
+        assert pool.get_stats()['pooled']['timeouts'] == 1
+        first.close()
+
+    def test_if_idle_connection_is_broken_reconnects(self, pooled_connection):
+        connection = pooled_connection()
+
+        connection.ensure_connection()
+        raw = connection.connection
+        connection.close()
+        raw.close()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        assert connection.connection is not raw
+        assert pool.get_stats()['pooled']['reconnects'] == 1
+        connection.close()
+
+    def test_if_transaction_is_open_rolls_back_before_reuse(self, pooled_connection):
+        connection = pooled_connection()
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id integer)')
+
+        connection.set_autocommit(False)
+        with connection.cursor() as cursor:
+            cursor.execute('INSERT INTO item VALUES (1)')
+        connection.close()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM item')
+            count, = cursor.fetchone()
+
+        assert count == 0
+        connection.close()
+
+
+@pytest.mark.django_db
+class TestRetrieveDatabasePoolStats:
+    def test_if_user_is_not_admin_returns_403(self, api_client, authenticate_user):
+        authenticate_user()
+        response = api_client.get('/ielts/db-pool/')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_if_user_is_admin_returns_200(self, api_client, authenticate_user):
+        authenticate_user(is_staff=True)
+        response = api_client.get('/ielts/db-pool/')
+
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,106 @@
+from datetime import date, timedelta
+from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+from model_bakery import baker
+from students.models import Curator, Student, Teacher, GroupSession, Review
+
+
+def get_sql(queries):
+    return ' '.join(query['sql'] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+class TestExpand:
+    def make_teachers(self, count):
+        teachers = [baker.make(Teacher, email=f'{i}@mail.ru', phone=f'+7{i}') for i in range(count)]
+        for i, teacher in enumerate(teachers):
+            baker.make(GroupSession, teacher=[teacher], _quantity=2)
+            for day in range(12):
+                review = baker.make(Review, teacher=teacher, name=f'{i}-{day}')
+                Review.objects.filter(pk=review.pk).update(date=date(2024, 1, 1) + timedelta(days=day))
+        return teachers
+
+    @pytest.mark.parametrize('count', [1, 5])
+    def test_if_teacher_relations_are_expanded_runs_fixed_number_of_queries(
+            self, api_client, authenticate_user, django_assert_num_queries, count):
+        self.make_teachers(count)
+
+        authenticate_user()
+        # The recent review window refresh, the page, and one query per expansion.
+        with django_assert_num_queries(4):
+            response = api_client.get('/ielts/teachers/?expand=groupsessions,reviews')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == count
+
+    def test_if_teacher_relations_are_expanded_returns_them_nested(self, api_client, authenticate_user):
+        teacher = self.make_teachers(1)[0]
+
+        authenticate_user()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f'/ielts/teachers/{teacher.id}/?expand=groupsessions,reviews')
+
+        group_session = teacher.groupsessions.order_by('id').first()
+        assert response.status_code == status.HTTP_200_OK
+        assert {'id': group_session.id, 'title': group_session.title, 'description': group_session.description} in \
+            response.data['groupsessions']
+        assert [review['name'] for review in response.data['reviews']] == [f'0-{day}' for day in range(11, 1, -1)]
+        assert 'about_me' not in get_sql(queries).split('students_groupsession')[-1]
+
+    def test_if_group_session_teacher_is_expanded_returns_summary(
+            self, api_client, authenticate_user, django_assert_num_queries):
+        teacher = baker.make(Teacher, about_me='long text')
+        group_session = baker.make(GroupSession, teacher=[teacher])
+
+        authenticate_user()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f'/ielts/group_sessions/{group_session.id}/?expand=teacher')
+
+        assert response.data['teacher'] == [
+            {'id': teacher.id, 'first_name': teacher.first_name, 'last_name': teacher.last_name}
+        ]
+        assert len(queries) == 2
+        assert 'about_me' not in get_sql(queries)
+
+    def test_if_curator_is_not_expanded_skips_join(self, api_client, authenticate_user):
+        baker.make(Student, curator=baker.make(Curator))
+
+        authenticate_user()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/ielts/students/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'students_curator' not in get_sql(queries)
+
+    def test_if_expansion_is_combined_with_fields_returns_only_them(self, api_client, authenticate_user):
+        curator = baker.make(Curator)
+        student = baker.make(Student, curator=curator)
+
+        authenticate_user()
+        response = api_client.get('/ielts/students/?expand=curator&fields=id,curator')
+
+        assert response.data['results'] == [
+            {'id': student.id, 'curator': {'id': curator.id, 'name': curator.name, 'phone': curator.phone}}
+        ]
+
+    def test_if_expanded_model_changes_returns_fresh_response(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+        group_session = baker.make(GroupSession, teacher=[teacher], title='old')
+
+        authenticate_user()
+        api_client.get('/ielts/teachers/?expand=groupsessions')
+        group_session.title = 'new'
+        group_session.save()
+        response = api_client.get('/ielts/teachers/?expand=groupsessions')
+
+        assert response.data[0]['groupsessions'][0]['title'] == 'new'
+
+    def test_if_expansion_is_unknown_returns_400(self, api_client, authenticate_user):
+        authenticate_user()
+
+        response = api_client.get('/ielts/teachers/?expand=reviews,students')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {'expand': ['Unknown expansion(s): students.']}
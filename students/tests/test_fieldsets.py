@@ -0,0 +1,86 @@
+from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+from model_bakery import baker
+from students.models import Curator, Student, Teacher, GroupSession, Review
+
+
+def get_sql(queries):
+    return ' '.join(query['sql'] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def test_if_fields_are_requested_returns_only_them(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher, about_me='long text')
+        baker.make(GroupSession, teacher=[teacher])
+
+        authenticate_user()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/ielts/teachers/?fields=id,first_name')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [{'id': teacher.id, 'first_name': teacher.first_name}]
+        assert 'about_me' not in get_sql(queries)
+        assert 'students_groupsession' not in get_sql(queries)
+
+    def test_if_fields_are_omitted_returns_the_rest(self, api_client, authenticate_user):
+        group_session = baker.make(GroupSession, teacher=[baker.make(Teacher)])
+
+        authenticate_user()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/ielts/group_sessions/?omit=description,teacher')
+
+        assert response.data == [{'id': group_session.id, 'title': group_session.title}]
+        assert len(queries) == 1
+        assert 'description' not in get_sql(queries)
+
+    def test_if_relation_is_requested_keeps_its_prefetch(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+        group_session = baker.make(GroupSession, teacher=[teacher])
+
+        authenticate_user()
+        response = api_client.get(f'/ielts/teachers/{teacher.id}/?fields=groupsessions')
+
+        assert response.data == {'groupsessions': [group_session.id]}
+
+    def test_if_related_field_is_requested_keeps_its_join(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+        baker.make(Review, teacher=teacher, _quantity=2)
+
+        authenticate_user()
+        response = api_client.get('/ielts/teachers/?fields=review_count')
+
+        assert response.data == [{'review_count': 2}]
+
+    def test_if_cursor_page_is_requested_loads_boundary_positions_once(
+            self, api_client, authenticate_user, django_assert_num_queries):
+        curator = baker.make(Curator)
+        for i in range(15):
+            baker.make(Student, curator=curator, course=21, email=f'{i}@mail.ru')
+
+        authenticate_user()
+        with django_assert_num_queries(1):
+            response = api_client.get('/ielts/students/?cursor=&fields=id,status')
+
+        assert len(response.data['results']) == 10
+        assert set(response.data['results'][0]) == {'id', 'status'}
+        assert response.data['next'] is not None
+
+    def test_if_export_is_requested_ignores_fields(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+        baker.make(Review, teacher=teacher, description='useful')
+
+        authenticate_user()
+        response = api_client.get(f'/ielts/teachers/{teacher.id}/reviews/export/?fields=name')
+
+        assert b'useful' in b''.join(response.streaming_content)
+
+    def test_if_field_is_unknown_returns_400(self, api_client, authenticate_user):
+        authenticate_user()
+
+        response = api_client.get('/ielts/curators/?fields=id,nickname&omit=age')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {'fields': ['Unknown field(s): nickname.'], 'omit': ['Unknown field(s): age.']}
@@ -1,4 +1,5 @@
 from rest_framework import status
+import json
 import pytest
 from model_bakery import baker
 from students.models import Teacher, GroupSession
@@ -215,3 +216,36 @@ class TestDeleteGroupSession:
         response = api_client.delete(f'/ielts/group_sessions/{groupsession.pk}/')
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+class TestStreamGroupSessionList:
+    def test_if_filtered_stream_is_requested_returns_matching_rows(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+        group_session = baker.make(GroupSession, teacher=[teacher])
+        baker.make(GroupSession, _quantity=3)
+
+        authenticate_user()
+        response = api_client.get(f'/ielts/group_sessions/?stream=1&teacher={teacher.pk}')
+
+        assert response.status_code == status.HTTP_200_OK
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        assert rows == [{
+            'id': group_session.pk,
+            'title': group_session.title,
+            'description': group_session.description,
+            'teacher': [teacher.pk]
+        }]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSearchGroupSessions:
+    def test_if_word_is_in_description_returns_group_session(self, api_client, authenticate_user):
+        group_session = baker.make(GroupSession, title='Essay club', description='Task 2 argumentative essays')
+        baker.make(GroupSession, title='Speaking club', description='Part 3 discussion')
+
+        authenticate_user()
+        response = api_client.get('/ielts/group_sessions/?search=argument essay')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['id'] for row in response.data] == [group_session.pk]
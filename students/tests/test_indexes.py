@@ -0,0 +1,85 @@
+from datetime import date
+from django.contrib import admin
+from django.db import connection
+from django.test import RequestFactory
+import pytest
+from students.models import Curator, Student, Teacher, GroupSession, Review
+
+
+def get_plan(queryset):
+    return queryset.explain()
+
+
+def get_indexes(model):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    return [constraint['columns'] for constraint in constraints.values() if constraint['index']]
+
+
+def search(model, term):
+    model_admin = admin.site._registry[model]
+    queryset, _ = model_admin.get_search_results(RequestFactory().get('/'), model.objects.all(), term)
+    return queryset
+
+
+HOT_QUERIES = {
+    'student list by course': lambda: Student.objects.filter(course=21).order_by('course', 'last_name'),
+    'student list by curator': lambda: Student.objects.filter(curator_id=1).order_by('course', 'last_name'),
+    'student keyset page': lambda: Student.objects.filter(course__gte=21).order_by('course', 'last_name', 'id'),
+    'student exam date range': lambda: Student.objects.filter(
+        exam_date__gte=date(2022, 1, 1), exam_date__lt=date(2022, 4, 30)
+    ),
+    'student admin search': lambda: search(Student, 'smi'),
+    'review list by teacher': lambda: Review.objects.filter(teacher_id=1),
+    'review keyset page': lambda: Review.objects.filter(
+        teacher_id=1, date__lte=date(2022, 1, 1)
+    ).order_by('-date', '-id'),
+    'teacher admin search': lambda: search(Teacher, 'ann'),
+    'group session admin search': lambda: search(GroupSession, 'ess'),
+    'curator admin search': lambda: search(Curator, 'ann'),
+}
+
+# MySQL's plans depend on table statistics, so there only the indexes the hot queries need are checked.
+HOT_QUERY_INDEXES = {
+    'student list by course': (Student, ['course', 'last_name', 'id']),
+    'student list by curator': (Student, ['curator_id', 'course', 'last_name']),
+    'student exam date range': (Student, ['exam_date']),
+    'student admin search': (Student, ['last_name']),
+    'review keyset page': (Review, ['teacher_id', 'date', 'id']),
+    'teacher admin search': (Teacher, ['first_name', 'last_name']),
+    'teacher last name search': (Teacher, ['last_name']),
+    'group session admin search': (GroupSession, ['title']),
+    'curator admin search': (Curator, ['name']),
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='asserts on SQLite query plans')
+class TestQueryPlans:
+    @pytest.mark.parametrize('name', HOT_QUERIES)
+    def test_if_hot_query_is_planned_uses_index(self, name):
+        plan = get_plan(HOT_QUERIES[name]())
+
+        assert 'USING' in plan and 'INDEX' in plan
+        assert not any(line.lstrip(' -|`').startswith('SCAN') for line in plan.splitlines()), plan
+
+    def test_if_admin_search_is_planned_uses_nocase_index(self):
+        plan = get_plan(search(Student, 'smi'))
+
+        assert 'students_student_last_name_nocase' in plan
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor == 'sqlite', reason='SQLite runs TestQueryPlans instead')
+class TestIndexes:
+    @pytest.mark.parametrize('name', HOT_QUERY_INDEXES)
+    def test_if_hot_query_is_indexed_returns_index(self, name):
+        model, columns = HOT_QUERY_INDEXES[name]
+
+        assert columns in get_indexes(model)
+
+
+@pytest.mark.django_db
+class TestRedundantIndexes:
+    def test_if_curator_is_indexed_returns_only_composite_index(self):
+        assert ['curator_id'] not in get_indexes(Student)
@@ -0,0 +1,129 @@
+import time
+from asgiref.sync import async_to_sync
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import AsyncClient, override_settings
+import pytest
+from model_bakery import baker
+from students import metrics
+from students.models import Curator
+from students.serializers import CuratorSerializer
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    metrics.registry.reset()
+    yield metrics.registry
+    metrics.registry.reset()
+
+
+def get_histogram(registry, name, route, action):
+    return registry.histograms[name][(route, action)]
+
+
+class TestRegistry:
+    def test_if_values_are_observed_renders_cumulative_buckets(self, registry):
+        sample = metrics.Sample()
+        sample.queries = 3
+        registry.observe('students-list', 'list', 'GET', 200, 0.02, sample)
+        registry.observe('students-list', 'list', 'GET', 200, 0.3, sample)
+
+        text = registry.render()
+
+        assert 'ielts_http_requests_total{route="students-list",action="list",method="GET",status="200"} 2' in text
+        assert 'ielts_http_request_duration_seconds_bucket{route="students-list",action="list",le="0.025"} 1' in text
+        assert 'ielts_http_request_duration_seconds_bucket{route="students-list",action="list",le="+Inf"} 2' in text
+        assert 'ielts_db_queries_per_request_sum{route="students-list",action="list"} 6' in text
+
+
+@pytest.mark.django_db
+class TestMetricsMiddleware:
+    def test_if_list_is_requested_records_queries_and_rendering(self, api_client, authenticate_user, registry):
+        baker.make(Curator)
+        authenticate_user()
+
+        api_client.get('/ielts/curators/')
+
+        queries = get_histogram(registry, 'db_queries_per_request', 'curators-list', 'list')
+        rendering = get_histogram(registry, 'serialization_duration_seconds', 'curators-list', 'list')
+        assert queries.count == 1
+        assert queries.sum > 0
+        assert rendering.sum > 0
+        assert registry.requests == {('curators-list', 'list', 'GET', '200'): 1}
+
+    def test_if_list_is_requested_records_serializer_time(self, api_client, authenticate_user, registry, monkeypatch):
+        baker.make(Curator)
+        to_representation = CuratorSerializer.to_representation
+
+        def slow_to_representation(serializer, instance):
+            time.sleep(0.05)
+            return to_representation(serializer, instance)
+        monkeypatch.setattr(CuratorSerializer, 'to_representation', slow_to_representation)
+        authenticate_user()
+
+        api_client.get('/ielts/curators/')
+
+        assert get_histogram(registry, 'serialization_duration_seconds', 'curators-list', 'list').sum >= 0.05
+
+    def test_if_async_view_is_requested_records_queries(self, registry):
+        baker.make(Curator)
+        headers = {'Authorization': f'JWT {AccessToken.for_user(User.objects.create_user("user"))}'}
+
+        async def get():
+            return await AsyncClient().get('/ielts/async/curators/', headers=headers)
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            async_to_sync(get)()
+
+        assert get_histogram(registry, 'db_queries_per_request', 'async-curators-list', 'get').sum > 0
+
+    def test_if_route_is_unknown_records_it_as_unmatched(self, api_client, registry):
+        api_client.get('/ielts/missing/')
+
+        assert registry.requests == {('unmatched', 'get', 'GET', '404'): 1}
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_if_sampling_is_off_records_nothing(self, api_client, authenticate_user, registry):
+        authenticate_user()
+
+        api_client.get('/ielts/curators/')
+
+        assert registry.requests == {}
+
+
+@pytest.mark.django_db
+class TestRetrieveMetrics:
+    def test_if_user_is_anonymous_returns_401(self, api_client):
+        response = api_client.get('/metrics')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_user_is_not_admin_returns_403(self, api_client, authenticate_user):
+        authenticate_user()
+
+        response = api_client.get('/metrics')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_if_user_is_admin_returns_200(self, api_client, authenticate_user):
+        authenticate_user(is_staff=True)
+
+        response = api_client.get('/metrics')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'text/plain; charset=utf-8'
+        assert '# TYPE ielts_http_request_duration_seconds histogram' in response.content.decode()
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_if_scraper_token_is_valid_returns_200(self, api_client):
+        response = api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'ielts_response_cache_total{outcome="hits"}' in response.content.decode()
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_if_scraper_token_is_wrong_returns_401(self, api_client):
+        response = api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,106 @@
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import BytesIO
+import gzip
+import brotli
+import pytest
+from model_bakery import baker
+from django.utils.translation import gettext_lazy
+from students.models import Curator
+from students.middleware import parse_accept_encoding
+from students.parsers import ORJSONParser
+from students.renderers import ORJSONRenderer
+
+
+class TestORJSONRenderer:
+    def test_if_data_has_python_types_renders_same_as_json_renderer(self):
+        data = ReturnDict({
+            'goal_score': Decimal('6.5'),
+            'exam_date': date(2024, 5, 1),
+            'created': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            'counts': {1: 2},
+            'label': gettext_lazy('Regular'),
+            'about_me': 'line\u2028separator',
+            'rows': [{'name': 'Анна'}],
+        }, serializer=None)
+
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_if_indent_is_requested_renders_indented(self):
+        assert ORJSONRenderer().render({'a': 1}, 'application/json; indent=2') == b'{\n  "a": 1\n}'
+
+
+class TestORJSONParser:
+    def test_if_body_is_valid_returns_data(self):
+        assert ORJSONParser().parse(BytesIO(b'{"goal_score": 6.5}')) == {'goal_score': 6.5}
+
+    def test_if_body_is_invalid_raises_parse_error(self):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"goal_score":'))
+
+
+class TestParseAcceptEncoding:
+    def test_if_header_has_qualities_returns_them(self):
+        assert parse_accept_encoding('gzip;q=0.5, br , identity; q=0') == {'gzip': 0.5, 'br': 1.0, 'identity': 0.0}
+
+
+@pytest.mark.django_db
+class TestCompression:
+    @pytest.fixture
+    def curators(self):
+        for i in range(50):
+            baker.make(Curator, phone=f'+7{i}')
+
+    @pytest.mark.parametrize('coding, decompress', [('gzip', gzip.decompress), ('br', brotli.decompress)])
+    def test_if_coding_is_accepted_returns_compressed_body(
+            self, api_client, authenticate_user, curators, coding, decompress):
+        authenticate_user()
+        identity = api_client.get('/ielts/curators/')
+
+        response = api_client.get('/ielts/curators/', HTTP_ACCEPT_ENCODING=coding)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Encoding'] == coding
+        assert response['Vary'].endswith('Accept-Encoding')
+        assert response['ETag'] == f'W/{identity["ETag"]}'
+        assert decompress(response.content) == identity.content
+
+    def test_if_both_codings_are_accepted_prefers_brotli(self, api_client, authenticate_user, curators):
+        authenticate_user()
+
+        response = api_client.get('/ielts/curators/', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+
+        assert response['Content-Encoding'] == 'br'
+
+    def test_if_coding_is_refused_returns_identity(self, api_client, authenticate_user, curators):
+        authenticate_user()
+
+        response = api_client.get('/ielts/curators/', HTTP_ACCEPT_ENCODING='br;q=0, gzip;q=0')
+
+        assert not response.has_header('Content-Encoding')
+
+    def test_if_response_is_small_returns_identity(self, api_client, authenticate_user):
+        authenticate_user()
+
+        response = api_client.get('/ielts/curators/', HTTP_ACCEPT_ENCODING='gzip')
+
+        assert not response.has_header('Content-Encoding')
+
+    def test_if_response_is_streamed_returns_compressed_chunks(self, api_client, authenticate_user, curators):
+        authenticate_user()
+
+        response = api_client.get('/ielts/curators/?stream=1', HTTP_ACCEPT_ENCODING='gzip')
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(b''.join(response.streaming_content)).count(b'\n') == 50
+
+    def test_if_json_is_posted_returns_201(self, api_client, authenticate_user):
+        authenticate_user(is_staff=True)
+
+        response = api_client.post('/ielts/curators/', {'name': 'a', 'phone': '+71'}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
@@ -137,4 +137,88 @@ class TestDeleteReview:
         authenticate_user(is_staff=True)
         response = api_client.delete(f'/ielts/teachers/{teacher.pk}/reviews/{review.pk}/')
 
-        assert response.status_code == status.HTTP_204_NO_CONTENT
\ No newline at end of file
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+@pytest.mark.django_db
+class TestExportReviews:
+    def test_if_user_is_authenticated_exports_only_teacher_reviews(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher, email='a@mail.ru')
+        other_teacher = baker.make(Teacher, email='b@mail.ru')
+        baker.make(Review, teacher=teacher, _quantity=2)
+        baker.make(Review, teacher=other_teacher, _quantity=3)
+
+        authenticate_user()
+        response = api_client.get(f'/ielts/teachers/{teacher.pk}/reviews/export/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(b''.join(response.streaming_content).splitlines()) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSearchReviews:
+    def test_if_word_is_in_description_returns_teacher_review(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+        review = baker.make(Review, teacher=teacher, description='Great feedback on my essays')
+        baker.make(Review, teacher=teacher, description='Lessons were fine')
+
+        authenticate_user()
+        response = api_client.get(f'/ielts/teachers/{teacher.pk}/reviews/?search=feedback')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['id'] for row in response.data['results']] == [review.pk]
+
+
+@pytest.mark.django_db
+class TestConditionalGetReviews:
+    def test_if_other_teacher_gets_review_returns_304(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher, email='a@mail.ru')
+        other_teacher = baker.make(Teacher, email='b@mail.ru')
+        baker.make(Review, teacher=teacher)
+
+        authenticate_user()
+        response = api_client.get(f'/ielts/teachers/{teacher.pk}/reviews/')
+        baker.make(Review, teacher=other_teacher)
+        response = api_client.get(f'/ielts/teachers/{teacher.pk}/reviews/', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+class TestPaginateReviews:
+    def test_if_pages_are_followed_returns_every_review_newest_first(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+        reviews = baker.make(Review, teacher=teacher, _quantity=25)
+
+        authenticate_user()
+        ids = []
+        url = f'/ielts/teachers/{teacher.pk}/reviews/'
+        while url:
+            response = api_client.get(url)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+
+        assert ids == sorted((review.pk for review in reviews), reverse=True)
+
+    def test_if_page_is_not_empty_skips_teacher_lookup(
+            self, api_client, authenticate_user, django_assert_num_queries):
+        teacher = baker.make(Teacher)
+        baker.make(Review, teacher=teacher, _quantity=3)
+
+        authenticate_user()
+        with django_assert_num_queries(1):
+            response = api_client.get(f'/ielts/teachers/{teacher.pk}/reviews/')
+
+        assert len(response.data['results']) == 3
+
+    def test_if_teacher_does_not_exist_returns_404(self, api_client, authenticate_user):
+        authenticate_user()
+        response = api_client.get('/ielts/teachers/0/reviews/')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_if_review_is_posted_for_missing_teacher_returns_404(self, create_new_instance, authenticate_user):
+        authenticate_user()
+        response = create_new_instance('/ielts/teachers/0/reviews/', {'name': 'a', 'description': 'b'})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert not Review.objects.exists()
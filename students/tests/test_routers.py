@@ -0,0 +1,164 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+import pytest
+from model_bakery import baker
+from students.db import routers
+from students.middleware import ReplicaRoutingMiddleware
+from students.models import Curator, TeacherReviewStats
+
+REPLICA = 'replica_1'
+
+
+def start_request():
+    state = routers.RoutingState()
+    state.use_replicas = True
+    return state, routers.current_state.set(state)
+
+
+@pytest.fixture
+def state():
+    state, token = start_request()
+    yield state
+    routers.current_state.reset(token)
+
+
+@pytest.fixture
+def lags(monkeypatch):
+    lags = {}
+    monkeypatch.setattr(routers, 'measure_lag', lambda alias: lags[alias])
+    routers.reset_lags()
+    yield lags
+    routers.reset_lags()
+
+
+class TestReplicaRouter:
+    router = routers.ReplicaRouter()
+
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        settings.DATABASE_REPLICAS = ['replica_1', 'replica_2']
+
+    def test_if_requests_read_returns_one_replica_each_in_turn(self):
+        aliases = set()
+        for _ in range(2):
+            state, token = start_request()
+            alias = self.router.db_for_read(Curator)
+            assert self.router.db_for_read(Curator) == alias
+            aliases.add(alias)
+            routers.current_state.reset(token)
+
+        assert aliases == {'replica_1', 'replica_2'}
+
+    def test_if_request_wrote_returns_primary(self, state):
+        self.router.db_for_write(Curator)
+
+        assert self.router.db_for_read(Curator) is None
+        assert state.wrote
+
+    def test_if_write_is_background_returns_replica(self, state):
+        self.router.db_for_write(TeacherReviewStats, background=True)
+
+        assert self.router.db_for_read(Curator) is not None
+
+    def test_if_no_request_is_routed_returns_primary(self):
+        assert self.router.db_for_read(Curator) is None
+
+    @override_settings(DATABASE_REPLICA_SELECTION='least_lag', DATABASE_REPLICA_MAX_LAG=5)
+    def test_if_least_lag_is_selected_returns_most_current_replica(self, state, lags):
+        lags.update({'replica_1': 3, 'replica_2': 1})
+
+        assert self.router.db_for_read(Curator) == 'replica_2'
+
+    @override_settings(DATABASE_REPLICA_SELECTION='least_lag', DATABASE_REPLICA_MAX_LAG=5)
+    def test_if_all_replicas_lag_returns_primary(self, state, lags):
+        lags.update({'replica_1': 30, 'replica_2': float('inf')})
+
+        assert self.router.db_for_read(Curator) == 'default'
+
+
+@pytest.mark.django_db(databases=['default', REPLICA], transaction=True)
+class TestReplicaRoutingMiddleware:
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings, tmp_path):
+        settings.DATABASE_REPLICAS = [REPLICA]
+        settings.CACHES = {
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tmp_path}
+        }
+
+    def get(self, client, path):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = client.get(path)
+        return response, len(primary), len(replica)
+
+    def test_if_list_is_requested_reads_from_replica(self, api_client, authenticate_user):
+        baker.make(Curator)
+        authenticate_user()
+
+        response, primary, replica = self.get(api_client, '/ielts/curators/')
+
+        assert len(response.data) == 1
+        assert (primary, replica) == (0, 1)
+
+    def test_if_client_wrote_reads_from_primary(self, api_client, authenticate_user):
+        authenticate_user(is_staff=True)
+        api_client.credentials(HTTP_AUTHORIZATION='JWT token')
+        api_client.post('/ielts/curators/', {'name': 'a', 'phone': '+71'})
+
+        response, primary, replica = self.get(api_client, '/ielts/curators/')
+
+        assert len(response.data) == 1
+        assert replica == 0
+
+    def test_if_other_client_wrote_reads_from_replica(self, api_client, authenticate_user):
+        authenticate_user(is_staff=True)
+        api_client.credentials(HTTP_AUTHORIZATION='JWT token')
+        api_client.post('/ielts/curators/', {'name': 'a', 'phone': '+71'})
+        api_client.credentials(HTTP_AUTHORIZATION='JWT other')
+
+        response, primary, replica = self.get(api_client, '/ielts/curators/')
+
+        assert replica == 1
+
+    def test_if_scope_just_changed_skips_response_cache(self, api_client, authenticate_user):
+        baker.make(Curator)
+        authenticate_user()
+
+        response, primary, replica = self.get(api_client, '/ielts/curators/')
+
+        assert not response.has_header('X-Cache')
+        assert not response.has_header('ETag')
+
+    @override_settings(DATABASE_REPLICA_PIN_SECONDS=0)
+    def test_if_scope_changed_earlier_caches_response(self, api_client, authenticate_user):
+        baker.make(Curator)
+        authenticate_user()
+
+        response, primary, replica = self.get(api_client, '/ielts/curators/')
+
+        assert response['X-Cache'] == 'MISS'
+
+    def test_if_admin_changelist_is_requested_reads_from_replica(self, client):
+        client.force_login(baker.make('auth.User', is_staff=True, is_superuser=True))
+
+        response, primary, replica = self.get(client, '/admin/students/curator/')
+
+        assert response.status_code == 200
+        assert primary == 0
+        assert replica > 0
+
+    def test_if_method_is_unsafe_uses_primary(self, api_client, authenticate_user):
+        authenticate_user(is_staff=True)
+
+        with CaptureQueriesContext(connections[REPLICA]) as replica:
+            api_client.post('/ielts/curators/', {'name': 'a', 'phone': '+71'})
+
+        assert len(replica) == 0
+
+    def test_if_cache_is_process_local_refuses_to_start(self, settings):
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+        with pytest.raises(ImproperlyConfigured):
+            ReplicaRoutingMiddleware(lambda request: None)
@@ -0,0 +1,49 @@
+import os
+import shlex
+import subprocess
+import sys
+from django.conf import settings
+import pytest
+
+# Runs manage.py as the entrypoint does, with gunicorn stopped after it has loaded the application.
+SERVE = '''
+import runpy, sys
+from gunicorn.app.base import BaseApplication
+
+def run(self):
+    self.load()
+    print(f'loaded {self.cfg.workers} workers')
+
+BaseApplication.run = run
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name='__main__')
+'''
+
+
+def get_entrypoint_command():
+    lines = (settings.BASE_DIR / 'docker-entrypoint.sh').read_text().splitlines()
+    command = shlex.split(next(line for line in reversed(lines) if line.strip()))
+    assert command[:3] == ['exec', 'python', 'manage.py']
+    return command[2:]
+
+
+def get_compose_environment():
+    lines = (settings.BASE_DIR / 'web.env').read_text().splitlines()
+    environment = dict(line.split('=', 1) for line in lines if line and not line.startswith('#'))
+    # docker-compose.yml passes these from the host.
+    return {**environment, 'SECRET_KEY': 'secret', 'DB_PASSWORD': 'password'}
+
+
+class TestServeInContainer:
+    def test_if_entrypoint_command_runs_under_compose_environment_loads_application(self):
+        pytest.importorskip('gunicorn')
+        pytest.importorskip('MySQLdb')
+        environment = {**os.environ, **get_compose_environment()}
+
+        result = subprocess.run(
+            [sys.executable, '-c', SERVE, *get_entrypoint_command()],
+            cwd=settings.BASE_DIR, env=environment, capture_output=True, text=True, timeout=60
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert 'loaded' in result.stdout
@@ -1,8 +1,18 @@
 from rest_framework import status
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+import csv
+from base64 import b64encode
+from datetime import date, timedelta
 import pytest
 import random
 from model_bakery import baker
-from students.models import Curator, Student
+from students.models import Curator, CuratorWorkload, Student
+from students import pagination
+from students.admin import StudentAdmin
+from students.pagination import CachedCountPaginator
 
 
 @pytest.mark.django_db
@@ -154,3 +164,442 @@ class TestDeleteStudent:
         response = api_client.delete(f'/ielts/students/{student.pk}/')
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+class TestRetrieveStudentListWithCursor:
+    def test_if_pages_are_followed_returns_every_student_once_in_order(self, api_client, authenticate_user):
+        curator = baker.make(Curator)
+        for i in range(25):
+            baker.make(Student, curator=curator, course=20 + i % 3, last_name='Smith', email=f'{i}@mail.ru')
+
+        authenticate_user()
+        response = api_client.get('/ielts/students/?cursor=')
+        seen = []
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            assert 'count' not in response.data
+            seen.extend((student['course'], student['last_name'], student['id']) for student in response.data['results'])
+            if response.data['next'] is None:
+                break
+            response = api_client.get(response.data['next'])
+
+        assert seen == sorted(seen)
+        assert len(seen) == len(set(seen)) == 25
+
+    def test_if_previous_link_is_followed_returns_previous_page(self, api_client, authenticate_user):
+        curator = baker.make(Curator)
+        for i in range(15):
+            baker.make(Student, curator=curator, course=20, email=f'{i}@mail.ru')
+
+        authenticate_user()
+        first_page = api_client.get('/ielts/students/?cursor=')
+        second_page = api_client.get(first_page.data['next'])
+        response = api_client.get(second_page.data['previous'])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == first_page.data['results']
+
+    def test_if_ordering_is_given_returns_students_in_that_order(self, api_client, authenticate_user):
+        curator = baker.make(Curator)
+        for i in range(12):
+            baker.make(Student, curator=curator, first_name=f'name{i % 4}', email=f'{i}@mail.ru')
+
+        authenticate_user()
+        first_page = api_client.get('/ielts/students/?cursor=&ordering=-first_name')
+        second_page = api_client.get(first_page.data['next'])
+
+        names = [student['first_name'] for student in first_page.data['results'] + second_page.data['results']]
+        assert names == sorted(names, reverse=True)
+        assert len(names) == 12
+
+    def test_if_cursor_is_invalid_returns_404(self, api_client, authenticate_user):
+        authenticate_user()
+        response = api_client.get('/ielts/students/?cursor=bad')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_if_cursor_position_is_tampered_returns_404(self, api_client, authenticate_user):
+        cursor = b64encode(b'p=["abc","x","1"]').decode('ascii')
+
+        authenticate_user()
+        response = api_client.get(f'/ielts/students/?cursor={cursor}')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data == {'detail': 'Invalid cursor'}
+
+
+@pytest.mark.django_db
+class TestBulkStudents:
+    def get_rows(self, curator, quantity):
+        return [
+            {
+                'course': 21,
+                'curator': f'http://testserver/ielts/curators/{curator.pk}/',
+                'first_name': 'a',
+                'last_name': 'b',
+                'phone': f'+7{i}',
+                'email': f'{i}@mail.ru'
+            }
+            for i in range(quantity)
+        ]
+
+    def test_if_user_is_not_admin_returns_403(self, api_client, authenticate_user):
+        curator = baker.make(Curator)
+
+        authenticate_user()
+        response = api_client.post('/ielts/students/bulk/', self.get_rows(curator, 2), format='json')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_if_data_is_valid_creates_in_constant_queries_returns_201(
+            self, api_client, authenticate_user, django_assert_max_num_queries):
+        curator = baker.make(Curator)
+
+        authenticate_user(is_staff=True)
+        with django_assert_max_num_queries(8):
+            response = api_client.post('/ielts/students/bulk/', self.get_rows(curator, 50), format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data) == 50
+        assert all(row['id'] is not None for row in response.data)
+        assert Student.objects.filter(curator=curator).count() == 50
+
+    def test_if_rows_are_not_unique_returns_per_row_errors_and_writes_nothing(self, api_client, authenticate_user):
+        curator = baker.make(Curator)
+        baker.make(Student, phone='+70', email='taken@mail.ru')
+        rows = self.get_rows(curator, 3)
+        rows[2]['email'] = rows[1]['email']
+        rows[1]['curator'] = 'http://testserver/ielts/curators/0/'
+
+        authenticate_user(is_staff=True)
+        response = api_client.post('/ielts/students/bulk/', rows, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert list(response.data[0]) == ['phone']
+        assert list(response.data[1]) == ['curator']
+        assert list(response.data[2]) == ['email']
+        assert Student.objects.count() == 1
+
+    def test_if_rows_are_patched_updates_only_given_fields_returns_200(self, api_client, authenticate_user):
+        students = [baker.make(Student, email=f'{i}@mail.ru') for i in range(3)]
+
+        authenticate_user(is_staff=True)
+        response = api_client.patch(
+            '/ielts/students/bulk/',
+            [{'id': student.pk, 'first_name': f'new{student.pk}'} for student in students],
+            format='json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        for student in students:
+            updated = Student.objects.get(pk=student.pk)
+            assert updated.first_name == f'new{student.pk}'
+            assert updated.last_name == student.last_name
+
+    def test_if_patched_row_does_not_exist_returns_400(self, api_client, authenticate_user):
+        student = baker.make(Student)
+
+        authenticate_user(is_staff=True)
+        response = api_client.patch(
+            '/ielts/students/bulk/',
+            [{'id': student.pk, 'first_name': 'x'}, {'id': 0, 'first_name': 'y'}],
+            format='json'
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data[0] == {}
+        assert 'id' in response.data[1]
+
+    def test_if_ids_are_deleted_returns_204(self, api_client, authenticate_user):
+        students = [baker.make(Student, email=f'{i}@mail.ru') for i in range(3)]
+
+        authenticate_user(is_staff=True)
+        response = api_client.delete('/ielts/students/bulk/', [students[0].pk, students[1].pk], format='json')
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert list(Student.objects.values_list('id', flat=True)) == [students[2].pk]
+
+    def test_if_ids_are_deleted_deletes_in_constant_queries_and_updates_workload(
+            self, api_client, authenticate_user, django_assert_max_num_queries):
+        curator = baker.make(Curator)
+        students = [baker.make(Student, curator=curator, email=f'{i}@mail.ru', phone=f'+7{i}') for i in range(50)]
+
+        authenticate_user(is_staff=True)
+        with django_assert_max_num_queries(6):
+            response = api_client.delete('/ielts/students/bulk/', [student.pk for student in students[:40]],
+                                         format='json')
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert CuratorWorkload.objects.get(curator=curator).student_count == 10
+
+    def test_if_deleted_id_does_not_exist_returns_400_and_deletes_nothing(self, api_client, authenticate_user):
+        student = baker.make(Student)
+
+        authenticate_user(is_staff=True)
+        response = api_client.delete('/ielts/students/bulk/', [student.pk, 0], format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Student.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestExportStudents:
+    def test_if_user_is_anonymous_returns_401(self, api_client):
+        response = api_client.get('/ielts/students/export/')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_user_is_not_admin_returns_403(self, api_client, authenticate_user):
+        authenticate_user()
+
+        response = api_client.get('/ielts/students/export/')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_if_course_is_filtered_streams_matching_students_as_csv(self, api_client, authenticate_user):
+        curator = baker.make(Curator, name='Anna')
+        student = baker.make(Student, curator=curator, course=21, email='a@mail.ru')
+        baker.make(Student, curator=curator, course=22, email='b@mail.ru')
+
+        authenticate_user(is_staff=True)
+        response = api_client.get('/ielts/students/export/?course=21')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'] == 'text/csv'
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        assert rows[0][:3] == ['id', 'course', 'curator']
+        assert rows[1][:3] == [str(student.pk), '21', 'Anna']
+        assert len(rows) == 2
+
+    def test_if_admin_action_is_run_streams_selected_students(self, client):
+        admin = User.objects.create_superuser('admin', 'admin@mail.ru', 'password')
+        students = [baker.make(Student, email=f'{i}@mail.ru') for i in range(3)]
+
+        client.force_login(admin)
+        response = client.post('/admin/students/student/', {
+            'action': 'export_as_csv',
+            '_selected_action': [students[0].pk, students[1].pk]
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(b''.join(response.streaming_content).splitlines()) == 3
+
+
+@pytest.mark.django_db
+class TestConditionalGetStudents:
+    def test_if_etag_matches_returns_304_without_queries(
+            self, api_client, authenticate_user, django_assert_num_queries):
+        baker.make(Student)
+
+        authenticate_user()
+        response = api_client.get('/ielts/students/')
+        with django_assert_num_queries(0):
+            not_modified = api_client.get('/ielts/students/', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        assert response['ETag'].startswith('"')
+        assert 'Last-Modified' not in response
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified['ETag'] == response['ETag']
+
+    def test_if_student_changed_since_etag_returns_200(self, api_client, authenticate_user):
+        student = baker.make(Student)
+
+        authenticate_user()
+        response = api_client.get(f'/ielts/students/{student.pk}/')
+        student.first_name = 'changed'
+        student.save()
+        response = api_client.get(f'/ielts/students/{student.pk}/', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['first_name'] == 'changed'
+
+    def test_if_changed_in_the_same_second_ignores_if_modified_since(self, api_client, authenticate_user):
+        student = baker.make(Student)
+
+        authenticate_user()
+        api_client.get(f'/ielts/students/{student.pk}/')
+        student.first_name = 'changed'
+        student.save()
+        response = api_client.get(f'/ielts/students/{student.pk}/', HTTP_IF_MODIFIED_SINCE=http_date())
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['first_name'] == 'changed'
+
+
+@pytest.mark.django_db
+class TestStudentCuratorRepresentation:
+    def test_if_list_is_requested_returns_curator_hyperlinks(self, api_client, authenticate_user):
+        students = [baker.make(Student, email=f'{i}@mail.ru') for i in range(3)]
+
+        authenticate_user()
+        response = api_client.get('/ielts/students/')
+
+        assert sorted(row['curator'] for row in response.data['results']) == sorted(
+            f'http://testserver/ielts/curators/{student.curator_id}/' for student in students
+        )
+
+    def test_if_curator_is_expanded_returns_embedded_curator(
+            self, api_client, authenticate_user, django_assert_max_num_queries):
+        curator = baker.make(Curator)
+        for i in range(5):
+            baker.make(Student, curator=curator, email=f'{i}@mail.ru')
+
+        authenticate_user()
+        with django_assert_max_num_queries(3):
+            response = api_client.get('/ielts/students/?expand=curator')
+
+        row = response.data['results'][0]
+        assert row['curator_id'] == curator.pk
+        assert row['curator'] == {'id': curator.pk, 'name': curator.name, 'phone': curator.phone}
+
+
+@pytest.mark.django_db
+class TestStudentStatus:
+    def make_students(self):
+        today = date.today()
+        return {
+            Student.STATUS_FINISHED: baker.make(Student, exam_date=today - timedelta(days=1), email='a@mail.ru'),
+            Student.STATUS_URGENT: baker.make(Student, exam_date=today + timedelta(days=3), email='b@mail.ru'),
+            Student.STATUS_REGULAR: baker.make(Student, exam_date=today + timedelta(days=300), email='c@mail.ru'),
+            Student.STATUS_UNSCHEDULED: baker.make(Student, exam_date=None, email='d@mail.ru'),
+        }
+
+    def test_if_students_are_listed_returns_status_of_each(self, api_client, authenticate_user):
+        students = self.make_students()
+
+        authenticate_user()
+        response = api_client.get('/ielts/students/')
+
+        statuses = {row['id']: row['status'] for row in response.data['results']}
+        assert statuses == {student.pk: status for status, student in students.items()}
+
+    def test_if_status_is_filtered_returns_matching_students(self, api_client, authenticate_user):
+        students = self.make_students()
+
+        authenticate_user()
+        response = api_client.get('/ielts/students/?status=URGENT')
+
+        assert [row['id'] for row in response.data['results']] == [students[Student.STATUS_URGENT].pk]
+
+    def test_if_admin_filters_by_status_renders_changelist(self, client):
+        admin = User.objects.create_superuser('admin', 'admin@mail.ru', 'password')
+        students = self.make_students()
+
+        client.force_login(admin)
+        response = client.get('/admin/students/student/?student_status=UNSCHEDULED')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.context['cl'].result_list) == [students[Student.STATUS_UNSCHEDULED]]
+
+    def test_if_admin_changelist_is_loaded_skips_status_counts(self, client):
+        admin = User.objects.create_superuser('admin', 'admin@mail.ru', 'password')
+        self.make_students()
+
+        client.force_login(admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/admin/students/student/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not any('GROUP BY' in query['sql'] for query in queries)
+
+    def test_if_admin_sorts_by_status_orders_by_exam_date(self, client):
+        admin = User.objects.create_superuser('admin', 'admin@mail.ru', 'password')
+        students = self.make_students()
+
+        client.force_login(admin)
+        column = StudentAdmin.list_display.index('urgent_students')
+        response = client.get(f'/admin/students/student/?o=-{column + 1}')
+
+        assert list(response.context['cl'].result_list) == [
+            students[Student.STATUS_REGULAR],
+            students[Student.STATUS_URGENT],
+            students[Student.STATUS_FINISHED],
+            students[Student.STATUS_UNSCHEDULED],
+        ]
+
+
+@pytest.mark.django_db
+class TestStudentListCount:
+    def test_if_page_is_requested_again_serves_count_from_cache(self, api_client, authenticate_user):
+        for i in range(3):
+            baker.make(Student, course=21, email=f'{i}@mail.ru')
+
+        authenticate_user()
+        api_client.get('/ielts/students/?course=21')
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/ielts/students/?course=21&page=1')
+
+        assert response.data['count'] == 3
+        assert response.data['count_exact'] is True
+        assert not any('COUNT(' in query['sql'] for query in queries)
+
+    def test_if_student_is_added_recounts(self, api_client, authenticate_user):
+        for i in range(3):
+            baker.make(Student, course=21, email=f'{i}@mail.ru')
+
+        authenticate_user()
+        api_client.get('/ielts/students/?course=21')
+        baker.make(Student, course=21, email='new@mail.ru')
+        response = api_client.get('/ielts/students/?course=21&page=1')
+
+        assert response.data['count'] == 4
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason='reads SQLite table statistics')
+    def test_if_table_statistics_exceed_threshold_returns_estimated_count(
+            self, api_client, authenticate_user, monkeypatch):
+        for i in range(12):
+            baker.make(Student, email=f'{i}@mail.ru')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        monkeypatch.setattr(CachedCountPaginator, 'estimate_threshold', 10)
+
+        authenticate_user()
+        response = api_client.get('/ielts/students/?page=2')
+
+        assert response.data['count'] == 12
+        assert response.data['count_exact'] is False
+        assert len(response.data['results']) == 2
+
+    def test_if_estimate_undercounts_links_every_page(self, api_client, authenticate_user, monkeypatch):
+        for i in range(25):
+            baker.make(Student, email=f'{i}@mail.ru')
+        monkeypatch.setattr(pagination, 'estimate_table_rows', lambda model, using: 10)
+        monkeypatch.setattr(CachedCountPaginator, 'estimate_threshold', 5)
+
+        authenticate_user()
+        ids = []
+        url = '/ielts/students/'
+        while url:
+            response = api_client.get(url)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+
+        assert response.data['count'] == 10
+        assert len(set(ids)) == 25
+
+    def test_if_admin_changelist_count_is_estimated_marks_it(self, client, monkeypatch):
+        admin = User.objects.create_superuser('admin', 'admin@mail.ru', 'password')
+        for i in range(3):
+            baker.make(Student, email=f'{i}@mail.ru')
+        monkeypatch.setattr(pagination, 'estimate_table_rows', lambda model, using: 10)
+        monkeypatch.setattr(CachedCountPaginator, 'estimate_threshold', 5)
+
+        client.force_login(admin)
+        response = client.get('/admin/students/student/')
+
+        assert response.status_code == 200
+        assert '&asymp; 10</span> students (estimated)' in response.content.decode()
+
+    def test_if_admin_changelist_count_is_exact_shows_no_marker(self, client):
+        admin = User.objects.create_superuser('admin', 'admin@mail.ru', 'password')
+        for i in range(3):
+            baker.make(Student, email=f'{i}@mail.ru')
+
+        client.force_login(admin)
+        response = client.get('/admin/students/student/')
+
+        assert response.status_code == 200
+        assert '3 students' in response.content.decode()
+        assert 'estimated' not in response.content.decode()
@@ -1,8 +1,15 @@
 from rest_framework import status
+import json
+from datetime import timedelta
+from io import StringIO
 import pytest
 import random
 from model_bakery import baker
-from students.models import Teacher, GroupSession
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from students.models import Teacher, GroupSession, Review, TeacherReviewStats
 
 
 @pytest.mark.django_db
@@ -70,7 +77,10 @@ class TestRetrieveTeacher:
             'email': teacher.email,
             'skype_name': teacher.skype_name,
             'about_me': teacher.about_me,
-            'groupsessions': []
+            'groupsessions': [],
+            'review_count': 0,
+            'last_review_date': None,
+            'recent_review_count': 0
         }
 
     def test_if_user_is_admin_returns_200(self, api_client, authenticate_user):
@@ -88,7 +98,10 @@ class TestRetrieveTeacher:
             'email': teacher.email,
             'skype_name': teacher.skype_name,
             'about_me': teacher.about_me,
-            'groupsessions': []
+            'groupsessions': [],
+            'review_count': 0,
+            'last_review_date': None,
+            'recent_review_count': 0
         }
 
 
@@ -180,7 +193,10 @@ class TestModifyFullyTeacher:
             'email': 'ka@mail.ru',
             'skype_name': 'kjdfj',
             'about_me': 'ajf',
-            'groupsessions': []
+            'groupsessions': [],
+            'review_count': 0,
+            'last_review_date': None,
+            'recent_review_count': 0
         }
 
 
@@ -216,7 +232,10 @@ class TestModifyPartlyTeacher:
             'email': teacher.email,
             'skype_name': teacher.skype_name,
             'about_me': teacher.about_me,
-            'groupsessions': []
+            'groupsessions': [],
+            'review_count': 0,
+            'last_review_date': None,
+            'recent_review_count': 0
         }
 
 
@@ -244,3 +263,186 @@ class TestDeleteTeacher:
         response = api_client.delete(f'/ielts/teachers/{teacher.pk}/')
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+class TestStreamTeacherList:
+    def test_if_user_is_anonymous_returns_401(self, api_client):
+        response = api_client.get('/ielts/teachers/?stream=1')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_ndjson_is_accepted_streams_one_teacher_per_line(self, api_client, authenticate_user):
+        teachers = [baker.make(Teacher, email=f'{i}@mail.ru') for i in range(3)]
+        group_session = baker.make(GroupSession, teacher=teachers)
+
+        authenticate_user()
+        response = api_client.get('/ielts/teachers/', HTTP_ACCEPT='application/x-ndjson')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        assert sorted(row['id'] for row in rows) == sorted(teacher.pk for teacher in teachers)
+        assert all(row['groupsessions'] == [group_session.pk] for row in rows)
+
+    def test_if_stream_is_requested_prefetches_groupsessions_per_chunk(
+            self, api_client, authenticate_user, django_assert_num_queries):
+        for i in range(5):
+            baker.make(Teacher, email=f'{i}@mail.ru', groupsessions=[baker.make(GroupSession)])
+
+        authenticate_user()
+        response = api_client.get('/ielts/teachers/?stream=1')
+
+        with django_assert_num_queries(2):
+            lines = b''.join(response.streaming_content).splitlines()
+        assert len(lines) == 5
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExportTeachers:
+    def test_if_search_is_given_exports_matching_teachers(self, api_client, authenticate_user):
+        baker.make(Teacher, first_name='Maria', email='a@mail.ru')
+        baker.make(Teacher, first_name='Ivan', email='b@mail.ru')
+
+        authenticate_user()
+        response = api_client.get('/ielts/teachers/export/?search=Maria')
+
+        assert response.status_code == status.HTTP_200_OK
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 2
+        assert 'Maria' in lines[1]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSearchTeachers:
+    def test_if_word_is_in_about_me_returns_teacher(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher, about_me='Former examiner with a passion for writing', email='a@mail.ru')
+        baker.make(Teacher, about_me='Speaking coach', email='b@mail.ru')
+
+        authenticate_user()
+        response = api_client.get('/ielts/teachers/?search=examin')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['id'] for row in response.data] == [teacher.pk]
+
+    def test_if_several_teachers_match_returns_most_relevant_first(self, api_client, authenticate_user):
+        weak = baker.make(Teacher, first_name='Anna', about_me='Reading, listening and much more', email='a@mail.ru')
+        strong = baker.make(Teacher, first_name='Olga', about_me='Reading reading reading', email='b@mail.ru')
+
+        authenticate_user()
+        response = api_client.get('/ielts/teachers/?search=reading')
+
+        assert [row['id'] for row in response.data] == [strong.pk, weak.pk]
+
+    def test_if_teacher_is_updated_or_deleted_keeps_index_in_sync(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher, first_name='Maria', email='a@mail.ru')
+        teacher.first_name = 'Elena'
+        teacher.save()
+
+        authenticate_user()
+        assert api_client.get('/ielts/teachers/?search=maria').data == []
+        assert len(api_client.get('/ielts/teachers/?search=elena').data) == 1
+
+        teacher.delete()
+        assert api_client.get('/ielts/teachers/?search=elena').data == []
+
+
+@pytest.mark.django_db
+class TestCacheTeachers:
+    def test_if_group_session_teachers_change_returns_fresh_teacher(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+        group_session = baker.make(GroupSession)
+
+        authenticate_user()
+        api_client.get(f'/ielts/teachers/{teacher.pk}/')
+        group_session.teacher.add(teacher)
+        response = api_client.get(f'/ielts/teachers/{teacher.pk}/')
+
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['groupsessions'] == [group_session.pk]
+
+    def test_if_group_session_is_deleted_returns_fresh_teacher(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+        group_session = baker.make(GroupSession, teacher=[teacher])
+
+        authenticate_user()
+        api_client.get(f'/ielts/teachers/{teacher.pk}/')
+        group_session.delete()
+        response = api_client.get(f'/ielts/teachers/{teacher.pk}/')
+
+        assert response.json()['groupsessions'] == []
+
+    def test_if_review_is_added_returns_fresh_review_count(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+
+        authenticate_user()
+        api_client.get(f'/ielts/teachers/{teacher.pk}/')
+        baker.make('students.Review', teacher=teacher)
+        response = api_client.get(f'/ielts/teachers/{teacher.pk}/')
+
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['review_count'] == 1
+
+
+@pytest.mark.django_db
+class TestTeacherReviewStats:
+    def test_if_reviews_are_created_and_deleted_returns_current_aggregates(self, api_client, authenticate_user):
+        teacher = baker.make(Teacher)
+
+        authenticate_user(is_staff=True)
+        for name in ('a', 'b'):
+            api_client.post(f'/ielts/teachers/{teacher.pk}/reviews/', {'name': name, 'description': 'c'})
+        review = Review.objects.filter(teacher=teacher).first()
+        api_client.delete(f'/ielts/teachers/{teacher.pk}/reviews/{review.pk}/')
+
+        stats = TeacherReviewStats.objects.get(teacher=teacher)
+        assert (stats.review_count, stats.recent_review_count) == (1, 1)
+        assert stats.last_review_date == timezone.localdate()
+
+    def test_if_window_has_moved_returns_refreshed_recent_count(self):
+        teacher = baker.make(Teacher)
+        baker.make(Review, teacher=teacher)
+        today = timezone.localdate()
+
+        TeacherReviewStats.refresh_recent(today + timedelta(days=31))
+
+        stats = TeacherReviewStats.objects.get(teacher=teacher)
+        assert (stats.review_count, stats.recent_review_count) == (1, 0)
+        assert stats.recent_as_of == today + timedelta(days=31)
+
+    def test_if_teachers_are_read_twice_a_day_refreshes_once(self, api_client, authenticate_user):
+        baker.make(Review, teacher=baker.make(Teacher))
+        TeacherReviewStats.objects.update(recent_as_of=None)
+
+        authenticate_user()
+        with CaptureQueriesContext(connection) as first:
+            api_client.get('/ielts/teachers/')
+        with CaptureQueriesContext(connection) as second:
+            api_client.get('/ielts/teachers/?ordering=first_name')
+
+        assert any(query['sql'].startswith('UPDATE') for query in first.captured_queries)
+        assert not any(query['sql'].startswith('UPDATE') for query in second.captured_queries)
+
+    def test_if_refresh_command_has_run_reads_skip_the_refresh(self, api_client, authenticate_user):
+        baker.make(Review, teacher=baker.make(Teacher))
+        TeacherReviewStats.objects.update(recent_as_of=None)
+
+        call_command('refresh_review_stats', stdout=StringIO())
+        authenticate_user()
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/ielts/teachers/')
+
+        assert response.data[0]['recent_review_count'] == 1
+        assert not any(query['sql'].startswith('UPDATE') for query in queries.captured_queries)
+
+    def test_if_ordered_by_review_count_returns_most_reviewed_first(self, api_client, authenticate_user):
+        quiet, busy = (baker.make(Teacher, email=f'{i}@mail.ru') for i in range(2))
+        baker.make(Review, teacher=busy, _quantity=3)
+        baker.make(Review, teacher=quiet)
+
+        authenticate_user()
+        response = api_client.get('/ielts/teachers/?ordering=-review_count')
+
+        assert [row['id'] for row in response.data] == [busy.pk, quiet.pk]
+        assert [row['review_count'] for row in response.data] == [3, 1]
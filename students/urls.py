@@ -1,5 +1,6 @@
+from django.urls import path
 from rest_framework_nested import routers
-from . import views
+from . import views, async_views
 
 router = routers.DefaultRouter()
 
@@ -11,4 +12,28 @@ router.register('group_sessions', views.GroupSessionViewSet, basename='group_ses
 teachers_router = routers.NestedDefaultRouter(router, 'teachers', lookup='teacher')
 teachers_router.register('reviews', views.ReviewViewSet, basename='teacher-reviews')
 
-urlpatterns = router.urls + teachers_router.urls
+async_urlpatterns = [
+    path('async/students/', async_views.AsyncStudentView.as_view(), name='async-students-list'),
+    path('async/students/<int:pk>/', async_views.AsyncStudentView.as_view(), name='async-students-detail'),
+    path('async/curators/', async_views.AsyncCuratorView.as_view(), name='async-curators-list'),
+    path('async/curators/<int:pk>/', async_views.AsyncCuratorView.as_view(), name='async-curators-detail'),
+    path('async/teachers/', async_views.AsyncTeacherView.as_view(), name='async-teachers-list'),
+    path('async/teachers/<int:pk>/', async_views.AsyncTeacherView.as_view(), name='async-teachers-detail'),
+    path('async/group_sessions/', async_views.AsyncGroupSessionView.as_view(), name='async-group_sessions-list'),
+    path(
+        'async/group_sessions/<int:pk>/', async_views.AsyncGroupSessionView.as_view(),
+        name='async-group_sessions-detail'
+    ),
+    path(
+        'async/teachers/<int:teacher_pk>/reviews/', async_views.AsyncReviewView.as_view(),
+        name='async-teacher-reviews-list'
+    ),
+    path(
+        'async/teachers/<int:teacher_pk>/reviews/<int:pk>/', async_views.AsyncReviewView.as_view(),
+        name='async-teacher-reviews-detail'
+    ),
+]
+
+urlpatterns = router.urls + teachers_router.urls + async_urlpatterns + [
+    path('db-pool/', views.DatabasePoolStatsView.as_view(), name='db-pool'),
+]
@@ -1,19 +1,47 @@
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, ProtectedError, Window
+from django.db.models.functions import RowNumber
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.fields import ListField, IntegerField
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Curator, Student, Teacher, GroupSession, Review
+from .models import Curator, CuratorWorkload, Student, Teacher, TeacherReviewStats, GroupSession, Review
 from .serializers import StudentSerializer, CuratorSerializer, TeacherSerializer, GroupSessionSerializer, \
-    ReviewSerializer
-from .pagination import DefaultPagination
+    ReviewSerializer, StudentBulkSerializer, CuratorWorkloadSerializer, TeacherSummarySerializer, \
+    GroupSessionSummarySerializer
+from .exports import STUDENT_COLUMNS, TEACHER_COLUMNS, REVIEW_COLUMNS
+from . import cache, metrics
+from .db import pool, routers
+from .mixins import StreamingListMixin, CSVExportMixin, CachedResponseMixin, SparseFieldsetMixin, ExpandMixin, \
+    Expansion, SerializationMetricsMixin
+from .search import FullTextSearchFilter
+from .permissions import HasMetricsToken
+from .renderers import PrometheusRenderer
+from .pagination import DefaultPagination, StudentCursorPagination, ReviewCursorPagination
 
 
-class CuratorViewSet(ModelViewSet):
+# Teachers sort by their review rollup under these names.
+TEACHER_REVIEW_ALIASES = {
+    'review_count': F('review_stats__review_count'),
+    'last_review_date': F('review_stats__last_review_date'),
+    'recent_review_count': F('review_stats__recent_review_count'),
+}
+
+
+class CuratorViewSet(CachedResponseMixin, SparseFieldsetMixin, StreamingListMixin, SerializationMetricsMixin,
+                     ModelViewSet):
     queryset = Curator.objects.all()
     serializer_class = CuratorSerializer
-    filter_backends = [SearchFilter]
+    cache_models = [Curator]
+    filter_backends = [FullTextSearchFilter]
     search_fields = ['name']
     permission_classes = [IsAdminUser]
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
@@ -23,59 +51,185 @@ class CuratorViewSet(ModelViewSet):
             return [IsAuthenticated()]
         return [IsAdminUser()]
 
+    def get_upcoming_exams(self, curator_ids=None):
+        # Depends on today's date, so it is counted live from student_exam_date_idx instead of rolled up.
+        queryset = Student.objects.filter_status(Student.STATUS_URGENT)
+        if curator_ids is not None:
+            queryset = queryset.filter(curator_id__in=curator_ids)
+        return dict(queryset.order_by().values('curator_id').annotate(count=Count('id')).values_list('curator_id', 'count'))
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        workload = get_object_or_404(CuratorWorkload.objects.select_related('curator'), curator_id=pk)
+        context = {**self.get_serializer_context(), 'upcoming_exams': self.get_upcoming_exams([workload.curator_id])}
+        return Response(CuratorWorkloadSerializer(workload, context=context).data)
+
+    @action(detail=False)
+    def dashboard(self, request):
+        workloads = CuratorWorkload.objects.select_related('curator').order_by('-student_count', 'curator_id')
+        context = {**self.get_serializer_context(), 'upcoming_exams': self.get_upcoming_exams()}
+        return Response(CuratorWorkloadSerializer(workloads, many=True, context=context).data)
+
     def destroy(self, request, *args, **kwargs):
-        if Student.objects.filter(curator_id=kwargs['pk']).count() > 0:
+        # Student.curator is PROTECTed, so the students themselves decide, not the rollup.
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
             return Response(
                 {'error': 'Curator cannot be deleted as they are associated with students'},
                 status=status.HTTP_405_METHOD_NOT_ALLOWED)
-        return super().destroy(request, *args, **kwargs)
 
 
-class StudentViewSet(ModelViewSet):
+class StudentViewSet(ExpandMixin, CachedResponseMixin, SparseFieldsetMixin, CSVExportMixin, SerializationMetricsMixin,
+                     ModelViewSet):
     serializer_class = StudentSerializer
+    cache_models = [Student]
     filter_backends = [OrderingFilter]
     ordering_fields = ['first_name', 'last_name', 'course']
     pagination_class = DefaultPagination
     permission_classes = [IsAuthenticated]
+    export_columns = STUDENT_COLUMNS
+    export_filename = 'students.csv'
+    # get_status() reads the annotation added by with_status().
+    sparse_field_sources = {'status': []}
+    expansions = {
+        'curator': Expansion(
+            {'curator_id': IntegerField(read_only=True), 'curator': CuratorSerializer(read_only=True)},
+            select_related='curator'
+        ),
+    }
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
 
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if StudentCursorPagination.cursor_query_param in self.request.query_params:
+                self._paginator = StudentCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
     def get_queryset(self):
-        queryset = Student.objects.select_related('curator').all()
+        # The curator hyperlink only needs curator_id; ?expand=curator joins the row.
+        queryset = Student.objects.all()
         course = self.request.query_params.get('course')
         if course is not None:
-            queryset = Student.objects.filter(course=course).select_related('curator').all()
-        return queryset
+            queryset = Student.objects.filter(course=course)
+        status_filter = self.request.query_params.get('status')
+        if status_filter in dict(Student.STATUS_CHOICES):
+            queryset = queryset.filter_status(status_filter)
+        return queryset.with_status()
+
+    def get_cache_scopes(self):
+        # Statuses move with the calendar, so each day starts a new cache scope.
+        return super().get_cache_scopes() + [f'{Student._meta.label}:date={timezone.localdate()}']
 
     def get_permissions(self):
-        if self.request.method == 'GET':
+        # The export carries contact details and exam data the API doesn't show.
+        if self.request.method == 'GET' and self.action != 'export':
             return [IsAuthenticated()]
         return [IsAdminUser()]
 
+    @action(detail=False, methods=['post', 'patch', 'delete'])
+    def bulk(self, request):
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+
+        partial = request.method == 'PATCH'
+        serializer = StudentBulkSerializer(
+            Student.objects.all() if partial else None,
+            data=request.data,
+            many=True,
+            partial=partial,
+            context=self.get_serializer_context()
+        )
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            cache.invalidate(Student._meta.label)
+        return Response(serializer.data, status=status.HTTP_200_OK if partial else status.HTTP_201_CREATED)
+
+    def bulk_destroy(self, request):
+        ids = ListField(child=IntegerField(), allow_empty=False).run_validation(request.data)
+        with transaction.atomic():
+            existing = dict(Student.objects.filter(pk__in=ids).values_list('id', 'curator_id'))
+            errors = [{} if pk in existing else {'id': [f'Invalid pk "{pk}" - object does not exist.']} for pk in ids]
+            if any(errors):
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            # Nothing references students, so one DELETE can skip the per-row signal handlers,
+            # whose rollup and cache updates are made once below.
+            queryset = Student.objects.filter(pk__in=existing)
+            queryset._raw_delete(queryset.db)
+            CuratorWorkload.rebuild(set(existing.values()))
+            cache.invalidate(Student._meta.label)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
-class TeacherViewSet(ModelViewSet):
-    queryset = Teacher.objects.prefetch_related('groupsessions').all()
+
+class TeacherViewSet(ExpandMixin, CachedResponseMixin, SparseFieldsetMixin, CSVExportMixin, StreamingListMixin,
+                     SerializationMetricsMixin, ModelViewSet):
     serializer_class = TeacherSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    cache_models = [Teacher]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, OrderingFilter]
     filterset_fields = ['groupsessions']
-    search_fields = ['first_name', 'last_name']
-    ordering_fields = ['first_name', 'last_name']
+    search_fields = ['first_name', 'last_name', 'about_me']
+    ordering_fields = ['first_name', 'last_name', 'review_count', 'last_review_date', 'recent_review_count']
     permission_classes = [IsAdminUser]
+    export_columns = TEACHER_COLUMNS
+    export_filename = 'teachers.csv'
+    expansions = {
+        'groupsessions': Expansion(
+            {'groupsessions': GroupSessionSummarySerializer(many=True, read_only=True)},
+            prefetch=Prefetch('groupsessions', GroupSession.objects.only('id', 'title', 'description'))
+        ),
+        # The newest page of each teacher's reviews, numbered per teacher in one query.
+        'reviews': Expansion(
+            {'reviews': ReviewSerializer(many=True, read_only=True)},
+            prefetch=Prefetch('reviews', Review.objects.annotate(rank=Window(
+                RowNumber(), partition_by=F('teacher_id'), order_by=[F('date').desc(), F('id').desc()]
+            )).filter(rank__lte=ReviewCursorPagination.page_size).only(
+                'id', 'teacher', 'name', 'description', 'date'
+            ).order_by('-date', '-id'))
+        ),
+    }
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
 
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            # Runs once a day, unless refresh_review_stats already has; that read sees the new counts on the primary.
+            if TeacherReviewStats.refresh_recent_daily():
+                routers.pin_primary()
+        return (
+            Teacher.objects.select_related('review_stats')
+            .prefetch_related(Prefetch('groupsessions', GroupSession.objects.only('id')))
+            .alias(**TEACHER_REVIEW_ALIASES)
+        )
+
+    def get_cache_scopes(self):
+        # Recent review counts slide with the calendar.
+        return super().get_cache_scopes() + [f'{Teacher._meta.label}:date={timezone.localdate()}']
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [IsAuthenticated()]
         return [IsAdminUser()]
 
 
-class GroupSessionViewSet(ModelViewSet):
-    queryset = GroupSession.objects.prefetch_related('teacher').all()
+class GroupSessionViewSet(ExpandMixin, CachedResponseMixin, SparseFieldsetMixin, StreamingListMixin,
+                          SerializationMetricsMixin, ModelViewSet):
+    queryset = GroupSession.objects.prefetch_related(Prefetch('teacher', Teacher.objects.only('id'))).all()
     serializer_class = GroupSessionSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    cache_models = [GroupSession]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, OrderingFilter]
     filterset_fields = ['teacher']
-    search_fields = ['title']
+    search_fields = ['title', 'description']
     ordering_fields = ['title']
     permission_classes = [IsAdminUser]
+    expansions = {
+        'teacher': Expansion(
+            {'teacher': TeacherSummarySerializer(many=True, read_only=True)},
+            prefetch=Prefetch('teacher', Teacher.objects.only('id', 'first_name', 'last_name'))
+        ),
+    }
     http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head', 'options']
 
     def get_permissions(self):
@@ -84,18 +238,56 @@ class GroupSessionViewSet(ModelViewSet):
         return [IsAdminUser()]
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(CachedResponseMixin, SparseFieldsetMixin, CSVExportMixin, SerializationMetricsMixin, ModelViewSet):
     serializer_class = ReviewSerializer
+    filter_backends = [FullTextSearchFilter]
+    search_fields = ['name', 'description']
     permission_classes = [IsAuthenticated]
+    export_columns = REVIEW_COLUMNS
+    export_filename = 'reviews.csv'
+    pagination_class = ReviewCursorPagination
     http_method_names = ['get', 'post', 'delete']
 
     def get_queryset(self):
         return Review.objects.filter(teacher_id=self.kwargs['teacher_pk'])
 
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        # Only an empty page can mean a missing teacher, so other pages skip the lookup.
+        if not page:
+            self.check_teacher_exists()
+        return page
+
+    def perform_create(self, serializer):
+        self.check_teacher_exists()
+        super().perform_create(serializer)
+
+    def check_teacher_exists(self):
+        if not Teacher.objects.filter(pk=self.kwargs['teacher_pk']).exists():
+            raise NotFound()
+
     def get_serializer_context(self):
         return {'teacher_id': self.kwargs['teacher_pk']}
 
+    def get_cache_scopes(self):
+        return [f"{Review._meta.label}:teacher={self.kwargs['teacher_pk']}"]
+
     def get_permissions(self):
         if self.request.method == 'DELETE':
             return [IsAdminUser()]
         return [IsAuthenticated()]
+
+
+class DatabasePoolStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(pool.get_stats())
+
+
+class MetricsView(APIView):
+    permission_classes = [HasMetricsToken]
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request):
+        return Response(metrics.registry.render())